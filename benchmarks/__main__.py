@@ -0,0 +1,276 @@
+"""Container resolution benchmark suite.
+
+Runs offline with the standard library only and prints results as JSON.
+A stored result can be used as baseline for the next run::
+
+    python -m benchmarks --output baseline.json
+    python -m benchmarks --baseline baseline.json
+
+Latencies are in microseconds per call, memory in bytes. With a
+baseline, benchmarks slower than `--threshold` times the baseline are
+reported as regressions and the exit status is 1.
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+from functools import partial
+from typing import Callable, Dict, Iterator, Tuple
+
+from src import Container, Provider
+from src.plan import make_plan
+
+from . import graphs
+
+TBenchmark = Callable[[], None]
+
+
+def _graph_cases() -> Iterator[Tuple[str, Container, object]]:
+    for name, build in (
+        ('wide', graphs.wide),
+        ('wide_forward_refs', partial(graphs.wide, forward_refs=True)),
+        ('deep', graphs.deep),
+        ('diamonds', graphs.diamonds),
+        ('large_registry', graphs.large_registry),
+        ('unions', graphs.unions),
+        ('context_factories', graphs.context_factories),
+    ):
+        container = Container()
+        yield name, container, build(container)
+
+    root = Container()
+    child = graphs.parent_chain(root)
+    yield 'parent_chain', child, list(child._registrations)[-1]
+
+
+def latency_benchmarks() -> Iterator[Tuple[str, TBenchmark]]:
+    for compiled in (False, True):
+        mode = 'compiled' if compiled else 'dynamic'
+        for name, container, key in _graph_cases():
+            if compiled:
+                container.compile()
+            container.get(key)
+            yield f'get/{name}/{mode}', lambda c=container, k=key: c.get(k)
+
+        container = Container()
+        singleton = graphs.make_class('Singleton')
+        container.register(singleton, singleton, True)
+        if compiled:
+            container.compile()
+        container.get(singleton)
+        yield (
+            f'get/singleton_hit/{mode}',
+            lambda c=container, k=singleton: c.get(k),
+        )
+
+        container = Container()
+        transient = graphs.make_class('Transient')
+        container.register(transient, transient, False)
+        if compiled:
+            container.compile()
+        container.get(transient)
+        yield (
+            f'get/transient/{mode}',
+            lambda c=container, k=transient: c.get(k),
+        )
+
+        container = Container()
+        settings = graphs.make_class('Settings')
+        container.register(settings, settings, True)
+        request = graphs.make_class('Request', [settings])
+        container.register(request, request, False)
+        if compiled:
+            container.compile()
+        overrides = {settings: settings()}
+        container.get(request, overrides)
+        yield (
+            f'get/transient_with_context/{mode}',
+            lambda c=container, k=request, o=overrides: c.get(k, o),
+        )
+
+        container = Container()
+        graphs.diamonds(container)
+        keys = list(container._registrations)
+        if compiled:
+            container.compile()
+        container.get_many(keys)
+        yield (
+            f'get_loop/diamonds_batch/{mode}',
+            lambda c=container, ks=keys: [c.get(k) for k in ks],
+        )
+        yield (
+            f'get_many/diamonds_batch/{mode}',
+            lambda c=container, ks=keys: c.get_many(ks),
+        )
+        yield (
+            f'get_many/diamonds_batch_memoized/{mode}',
+            lambda c=container, ks=keys: c.get_many(ks, memoize=True),
+        )
+
+    container = Container()
+    root = graphs.deep(container, depth=5)
+
+    class Batch:
+        def __init__(self, make: Provider[root]):
+            self.make = make
+
+    container.register(Batch, Batch, False)
+    yield 'provider/deep_5', container.get(Batch).make
+    yield 'get/deep_5/dynamic', lambda c=container, k=root: c.get(k)
+
+    container = Container()
+    singletons = [
+        graphs.make_class(f'Dependency{index}') for index in range(3)
+    ]
+    for klass in singletons:
+        container.register(klass, klass, True)
+    container.compile()
+    first, second, third = singletons
+    instances = [container.get(klass) for klass in singletons]
+
+    def handle(request, first: first, second: second, third: third):
+        return request
+
+    injected = container.inject(handle)
+    injected(None)
+    yield 'call/direct', lambda: handle(None, *instances)
+    yield 'call/manual_get', lambda c=container: handle(
+        None, c.get(first), c.get(second), c.get(third)
+    )
+    yield 'call/injected', lambda: injected(None)
+
+    def override(c=container, o=overrides):
+        with c.override(o):
+            pass
+
+    yield 'override/push_pop', override
+
+    for forward_refs in (False, True):
+        name = 'wide_forward_refs' if forward_refs else 'wide'
+        klass = graphs.wide(Container(), forward_refs=forward_refs)
+        yield f'plan/{name}', lambda k=klass: make_plan(k)
+
+    classes = [
+        graphs.make_class(f'Registered{index}') for index in range(1000)
+    ]
+
+    def register():
+        container = Container()
+        for klass in classes:
+            container.register(klass, klass, True)
+
+    yield 'register/1000_classes', register
+
+
+def measure(benchmark: TBenchmark, repeat: int) -> Dict[str, float]:
+    timer = timeit.Timer(benchmark)
+    number, _ = timer.autorange()
+    timings = [
+        seconds / number * 1e6 for seconds in timer.repeat(repeat, number)
+    ]
+    return {
+        'min_us': min(timings),
+        'median_us': statistics.median(timings),
+    }
+
+
+def measure_memory(count: int = 1000) -> Dict[str, float]:
+    root = Container()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        children = [Container(parent=root) for _ in range(count)]
+        per_child = (tracemalloc.get_traced_memory()[0] - before) / count
+
+        classes = [
+            graphs.make_class(f'Memory{index}') for index in range(count)
+        ]
+        before = tracemalloc.get_traced_memory()[0]
+        for klass in classes:
+            root.register(klass, klass, True)
+        per_registration = (
+            tracemalloc.get_traced_memory()[0] - before
+        ) / count
+
+        keyed = Container(parent=root)
+        before = tracemalloc.get_traced_memory()[0]
+        for index, klass in enumerate(classes):
+            keyed.register(f'service_{index}', klass, False)
+        per_keyed_registration = (
+            tracemalloc.get_traced_memory()[0] - before
+        ) / count
+    finally:
+        tracemalloc.stop()
+
+    del children
+    return {
+        'memory/empty_child_container': per_child,
+        'memory/registration': per_registration,
+        'memory/keyed_registration': per_keyed_registration,
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> Dict[str, float]:
+    """Ratio to baseline of benchmarks slower than `threshold`."""
+    regressions = {}
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        metric = 'min_us' if 'min_us' in result else 'bytes'
+        ratio = result[metric] / baseline[name][metric]
+        if ratio > threshold:
+            regressions[name] = ratio
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('--output', help='write results to this file')
+    parser.add_argument('--baseline', help='compare against stored results')
+    parser.add_argument('--threshold', type=float, default=1.2)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', default='', help='run matching only')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, benchmark in latency_benchmarks():
+        if args.filter in name:
+            results[name] = measure(benchmark, args.repeat)
+
+    for name, size in measure_memory().items():
+        if args.filter in name:
+            results[name] = {'bytes': size}
+
+    report = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'results': results,
+    }
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        report['regressions'] = compare(results, baseline, args.threshold)
+        status = int(bool(report['regressions']))
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    print(output)
+
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Synthetic service graphs for the benchmark suite.
+
+Every builder registers its graph into the given container and returns
+the key to resolve.
+"""
+from typing import Hashable, List, Optional, Sequence, Type, Union
+
+from src import Container
+
+
+def make_class(
+    name: str,
+    dependencies: Sequence[object] = (),
+    namespace: Optional[dict] = None,
+    forward_refs: bool = False,
+) -> Type:
+    """Class taking one constructor argument per annotation, written as
+    strings with `forward_refs`."""
+    namespace = dict(namespace or {})
+    annotations = {}
+    for index, dependency in enumerate(dependencies):
+        annotation = f'D{index}'
+        if forward_refs:
+            annotation = repr(annotation)
+        annotations[f'dependency_{index}'] = annotation
+        namespace[f'D{index}'] = dependency
+
+    arguments = ''.join(
+        f', {argument}: {annotation}'
+        for argument, annotation in annotations.items()
+    )
+    exec(
+        f'class {name}:\n'
+        f'    def __init__(self{arguments}):\n'
+        f'        pass\n',
+        namespace,
+    )
+    return namespace[name]
+
+
+def wide(
+    container: Container,
+    width: int = 50,
+    forward_refs: bool = False,
+) -> Hashable:
+    dependencies = []
+    for index in range(width):
+        klass = make_class(f'Leaf{index}')
+        container.register(klass, klass, True)
+        dependencies.append(klass)
+
+    root = make_class('Wide', dependencies, forward_refs=forward_refs)
+    container.register(root, root, False)
+    return root
+
+
+def deep(container: Container, depth: int = 50) -> Hashable:
+    klass = make_class('Link0')
+    container.register(klass, klass, False)
+    for index in range(1, depth):
+        klass = make_class(f'Link{index}', [klass])
+        container.register(klass, klass, False)
+    return klass
+
+
+def diamonds(container: Container, layers: int = 6) -> Hashable:
+    """Layers of two transient services depending on both of the
+    previous layer, bottomed by a singleton."""
+    previous: List[Type] = [make_class('Bottom')]
+    container.register(previous[0], previous[0], True)
+    for layer in range(layers):
+        current = [
+            make_class(f'Side{layer}_{side}', previous) for side in range(2)
+        ]
+        for klass in current:
+            container.register(klass, klass, False)
+        previous = current
+
+    top = make_class('Top', previous)
+    container.register(top, top, False)
+    return top
+
+
+def large_registry(container: Container, size: int = 1000) -> Hashable:
+    classes = []
+    for index in range(size):
+        dependencies = classes[-3:] if index % 2 else []
+        klass = make_class(f'Service{index}', dependencies)
+        container.register(klass, klass, bool(index % 3))
+        classes.append(klass)
+    return classes[size // 2]
+
+
+def unions(container: Container) -> Hashable:
+    class Registered:
+        pass
+
+    class Missing:
+        pass
+
+    container.register(Registered, Registered, True)
+    klass = make_class('WithUnions', [
+        Union[Missing, Registered],
+        Optional[Registered],
+        Optional[Missing],
+        Union[Missing, Optional[Registered]],
+    ] * 3)
+    container.register(klass, klass, False)
+    return klass
+
+
+def parent_chain(container: Container, depth: int = 10) -> Container:
+    """Child `depth` levels below `container`, returns the child; the
+    services are registered in the root and in the child."""
+    singleton = make_class('RootSingleton')
+    container.register(singleton, singleton, True)
+    transient = make_class('RootTransient', [singleton])
+    container.register(transient, transient, False)
+
+    child = container
+    for _ in range(depth):
+        child = Container(parent=child)
+
+    leaf = make_class('Leaf', [singleton, transient])
+    child.register(leaf, leaf, False)
+    return child
+
+
+def context_factories(container: Container, size: int = 20) -> Hashable:
+    dependencies = []
+    for index in range(size):
+        klass = make_class(f'Provided{index}')
+        if index % 2:
+            container.context[klass] = lambda injector: object()
+        else:
+            container.context[klass] = object()
+        dependencies.append(klass)
+
+    service = make_class('FromContext', dependencies)
+    container.register(service, service, False)
+    return service
@@ -0,0 +1,79 @@
+"""Resolution cost with container logging off.
+
+Counts calls into the `src.container` logger during resolution, which
+must stay at zero, and compares `get` timings of a tracing container
+whose records are dropped by the logger level against a non tracing
+one. Run from the repository root::
+
+    python -m benchmarks.logging_overhead
+"""
+import logging
+import timeit
+
+from src import Container
+from src import container as container_module
+
+NUMBER = 20000
+
+
+class CountingLogger(logging.Logger):
+    calls = 0
+
+    def isEnabledFor(self, level):
+        CountingLogger.calls += 1
+        return super().isEnabledFor(level)
+
+    def debug(self, *args, **kwargs):
+        CountingLogger.calls += 1
+        super().debug(*args, **kwargs)
+
+
+def make_container(trace: bool) -> Container:
+    container = Container(trace=trace)
+
+    class A:
+        pass
+
+    class B:
+        def __init__(self, a: A):
+            self.a = a
+
+    class C:
+        def __init__(self, a: A, b: B, value: int):
+            self.a = a
+            self.b = b
+
+    container.register(A, A, True)
+    container.register(B, B, False)
+    container.register('service', C, False)
+    container.context[int] = 1
+
+    return container
+
+
+def measure(container: Container) -> float:
+    seconds = min(timeit.repeat(
+        lambda: container.get('service'), number=NUMBER, repeat=5,
+    ))
+    return seconds / NUMBER * 1e6
+
+
+def main():
+    logger = CountingLogger(container_module.__name__, logging.WARNING)
+    container_module.logger = logger
+
+    for trace in (False, True):
+        container = make_container(trace)
+
+        CountingLogger.calls = 0
+        container.get('service')
+        calls = CountingLogger.calls
+
+        print(
+            f'trace={trace!s:<5}: {measure(container):6.2f} us/get, '
+            f'{calls} logger calls per get'
+        )
+
+
+if __name__ == '__main__':
+    main()
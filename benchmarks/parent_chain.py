@@ -0,0 +1,52 @@
+"""Per-`get` cost of services registered in a deep parent chain.
+
+Run from the repository root::
+
+    python -m benchmarks.parent_chain
+"""
+import timeit
+
+from src import Container
+
+NUMBER = 20000
+
+
+class Logger:
+    pass
+
+
+class Client:
+    def __init__(self, log: Logger):
+        self.log = log
+
+
+class Report:
+    def __init__(self, log: Logger, client: Client):
+        self.log = log
+        self.client = client
+
+
+def main():
+    for depth in (1, 10):
+        root = Container()
+        root.register(Logger, Logger, True)
+        root.register(Client, Client, False)
+
+        container = root
+        for _ in range(depth):
+            container = Container(parent=container)
+        container.register(Report, Report, False)
+        container.get(Report)
+
+        for key in (Logger, Report):
+            seconds = min(timeit.repeat(
+                lambda: container.get(key), number=NUMBER, repeat=5,
+            ))
+            print(
+                f'depth {depth:>2}, {key.__name__:<6}: '
+                f'{seconds / NUMBER * 1e6:6.2f} us/get'
+            )
+
+
+if __name__ == '__main__':
+    main()
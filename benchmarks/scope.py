@@ -0,0 +1,57 @@
+"""Cost of creating and disposing a scope per request.
+
+Run from the repository root::
+
+    python -m benchmarks.scope
+"""
+import timeit
+
+from src import Container
+
+NUMBER = 100000
+
+
+class Pool:
+    pass
+
+
+class Session:
+    def __init__(self, pool: Pool):
+        self.pool = pool
+
+
+class Handler:
+    def __init__(self, session: Session, pool: Pool):
+        self.session = session
+
+
+def empty_scope(container: Container):
+    with container.scope():
+        pass
+
+
+def scoped_request(container: Container):
+    with container.scope() as scope:
+        scope.get(Handler)
+        scope.get(Session)
+
+
+def main():
+    container = Container()
+    container.register(Pool, Pool, True)
+    container.register(Session, Session, False, scoped=True)
+    container.register(Handler, Handler, False)
+    scoped_request(container)
+
+    for name, request in (
+        ('create and dispose', empty_scope),
+        ('resolve handler and session', scoped_request),
+    ):
+        seconds = min(timeit.repeat(
+            lambda: request(container), number=NUMBER, repeat=5,
+        ))
+        print(f'{name:<28}: {seconds / NUMBER * 1e6:6.2f} us/scope')
+
+
+if __name__ == '__main__':
+    main()
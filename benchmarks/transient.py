@@ -0,0 +1,59 @@
+"""Per-`get` cost of transient services with 0, 5 and 20 dependencies.
+
+Each graph is measured on the dynamic and on the compiled path.
+
+Run from the repository root::
+
+    python -m benchmarks.transient
+"""
+import timeit
+
+from src import Container
+
+NUMBER = 20000
+
+
+def make_service(container: Container, dependencies: int):
+    singletons = []
+    for index in range(dependencies):
+        klass = type(f'Dependency{index}', (), {})
+        container.register(klass, klass, True)
+        singletons.append(klass)
+
+    namespace = {f'D{index}': klass for index, klass in enumerate(singletons)}
+    arguments = ', '.join(
+        f'd{index}: D{index}' for index in range(dependencies)
+    )
+    exec(
+        f'class Service:\n'
+        f'    def __init__(self, {arguments}):\n'
+        f'        pass\n',
+        namespace,
+    )
+    service = namespace['Service']
+    container.register(service, service, False)
+
+    return service
+
+
+def main():
+    for compiled in (False, True):
+        for dependencies in (0, 5, 20):
+            container = Container()
+            service = make_service(container, dependencies)
+            if compiled:
+                container.compile()
+            container.get(service)
+
+            seconds = min(timeit.repeat(
+                lambda: container.get(service), number=NUMBER, repeat=5,
+            ))
+            print(
+                f'transient, {dependencies:>2} dependencies, '
+                f'{"compiled" if compiled else "dynamic ":}: '
+                f'{seconds / NUMBER * 1e6:8.2f} us/get'
+            )
+
+
+if __name__ == '__main__':
+    main()
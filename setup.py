@@ -24,6 +24,7 @@ setup(name='di',
       author_email='vlmihnevich@gmail.com',
       maintainer='Vitali Mikhnevich',
       maintainer_email='vlmihnevich@gmail.com',
+      python_requires='>=3.7',
       install_requires=[],
       packages=[
           'di',
@@ -49,7 +50,6 @@ setup(name='di',
           'License :: OSI Approved :: BSD License',
           'Operating System :: OS Independent',
           'Programming Language :: Python',
-          'Programming Language :: Python :: 3.5',
           'Programming Language :: Python :: 3.7',
           'Programming Language :: Python :: 3.8',
           'Programming Language :: Python :: Implementation :: CPython',
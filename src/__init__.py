@@ -1,13 +1,7 @@
 from .container import Container, injectable
-
-import logging
-
-# TODO (VM): Get rid of this config
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(relativeCreated)6d %(threadName)s %(message)s'
-)
+from .lazy import Lazy
+from .provider import Provider
 
 __all__ = [
-    'injectable', 'Container',
+    'injectable', 'Container', 'Lazy', 'Provider',
 ]
@@ -0,0 +1,84 @@
+"""Current container or scope of a thread or asyncio task.
+
+The ambient target lives in a context variable, so asyncio tasks inherit
+the target active when they are created and threads start without one.
+Functions submitted to executors can carry it along with `bind`::
+
+    @ambient.inject
+    async def handle(request: Request, repository: Repository):
+        ...
+
+    with container.scope() as scope, ambient.use(scope):
+        await handle(request)
+"""
+import contextvars
+import functools
+import inspect
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+from .calls import CallPlan
+
+TFunction = TypeVar('TFunction', bound=Callable)
+
+_current: 'contextvars.ContextVar[Optional[Any]]' = contextvars.ContextVar(
+    'container', default=None
+)
+
+
+def current() -> Optional[Any]:
+    """Current container or scope, None outside of `use`."""
+    return _current.get()
+
+
+@contextmanager
+def use(target: Any) -> Iterator[Any]:
+    """Make a container or a scope current within the block."""
+    token = _current.set(target)
+    try:
+        yield target
+    finally:
+        _current.reset(token)
+
+
+def inject(function: TFunction) -> TFunction:
+    """Resolve annotated parameters of `function` or a coroutine function
+    left out by callers from the current container or scope.
+
+    The injection plan is built once, here; without a current target the
+    function is called as is. Coroutines resolve their dependencies
+    synchronously before they start.
+    """
+    plan = CallPlan(function)
+
+    if inspect.iscoroutinefunction(function):
+        @functools.wraps(function)
+        async def inject_async(*args, **kwargs):
+            target = _current.get()
+            if target is not None:
+                plan.bind(target, args, kwargs)
+            return await function(*args, **kwargs)
+
+        return inject_async
+
+    @functools.wraps(function)
+    def inject_sync(*args, **kwargs):
+        target = _current.get()
+        if target is not None:
+            plan.bind(target, args, kwargs)
+        return function(*args, **kwargs)
+
+    return inject_sync
+
+
+def bind(function: Callable) -> Callable:
+    """`function` running with the current target, e.g. to submit it to
+    a thread pool or `loop.run_in_executor`."""
+    target = _current.get()
+
+    @functools.wraps(function)
+    def run(*args, **kwargs):
+        with use(target):
+            return function(*args, **kwargs)
+
+    return run
@@ -0,0 +1,135 @@
+import asyncio
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from . import ambient, exceptions
+from .container import Container
+
+
+class Settings:
+    pass
+
+
+class Session:
+    pass
+
+
+class Repository:
+    def __init__(self, session: Session):
+        self.session = session
+
+
+class Missing:
+    pass
+
+
+@ambient.inject
+def handle(request, repository: Repository, *, settings: Settings,
+           missing: Missing = None, limit: int = 10):
+    return request, repository, settings, missing, limit
+
+
+@ambient.inject
+async def ahandle(request, repository: Repository, session: Session):
+    await asyncio.sleep(0)
+    return request, repository, session
+
+
+@pytest.fixture()
+def f_container():
+    container = Container({int: 20})
+    container.register(Settings, Settings, True)
+    container.register(Session, Session, False, scoped=True)
+    container.register(Repository, Repository, False)
+    return container
+
+
+def test_should_inject_from_current_container(f_container):
+    f_container.register(Session, Session, False)
+
+    with ambient.use(f_container):
+        request, repository, settings, missing, limit = handle('request')
+
+        assert ambient.current() is f_container
+        assert request == 'request'
+        assert isinstance(repository, Repository)
+        assert settings is f_container.get(Settings)
+        assert missing is None
+        assert limit == 20
+
+        explicit = Repository(Session())
+        assert handle('request', explicit)[1] is explicit
+        assert handle('request', repository=explicit)[1] is explicit
+        assert handle('request', settings='settings')[2] == 'settings'
+
+    assert ambient.current() is None
+    assert len(f_container._call_resolvers) == 1
+
+
+def test_should_call_as_is_without_current_container():
+    assert handle('request', 'repository', settings='settings') == (
+        'request', 'repository', 'settings', None, 10
+    )
+
+
+def test_should_inject_from_current_scope(f_container):
+    async def main():
+        with f_container.scope() as scope, ambient.use(scope):
+            request, repository, session = await ahandle('request')
+            assert repository.session is session is scope.get(Session)
+
+    asyncio.run(main())
+
+    with ambient.use(f_container):
+        with pytest.raises(exceptions.ScopeError):
+            asyncio.run(ahandle('request'))
+
+
+def test_tasks_should_keep_their_own_container(f_container):
+    async def run(container):
+        with ambient.use(container):
+            await asyncio.sleep(0)
+            return (await ahandle('request'))[2]
+
+    async def main():
+        scopes = [f_container.scope() for _ in range(3)]
+        sessions = await asyncio.gather(*(run(scope) for scope in scopes))
+        return scopes, sessions
+
+    scopes, sessions = asyncio.run(main())
+
+    assert [
+        scope.get(Session) for scope in scopes
+    ] == sessions
+    assert len(set(map(id, sessions))) == 3
+
+
+def test_bind_should_carry_container_to_threads(f_container):
+    f_container.register(Session, Session, False)
+
+    with ambient.use(f_container), ThreadPoolExecutor(1) as executor:
+        bound = executor.submit(ambient.bind(handle), 'request').result()
+        with pytest.raises(TypeError):
+            executor.submit(handle, 'request').result()
+
+    assert bound[2] is f_container.get(Settings)
+
+
+def test_should_respect_overrides(f_container):
+    f_container.register(Session, Session, False)
+    settings = Settings()
+
+    with ambient.use(f_container), f_container.override({Settings: settings}):
+        assert handle('request')[2] is settings
+
+
+def test_should_respect_overrides_within_scope(f_container):
+    settings = Settings()
+
+    with f_container.scope() as scope, ambient.use(scope), \
+            f_container.override({Settings: settings}):
+        _, repository, injected, _, _ = handle('request')
+
+        assert injected is settings
+        assert repository.session is scope.get(Session)
@@ -0,0 +1,183 @@
+"""Injection of dependencies into function calls."""
+import functools
+import inspect
+import itertools
+import sys
+from typing import Any, Callable, Dict, NamedTuple, Sequence, Tuple
+
+from . import overrides
+from .plan import Argument, Source, plan_parameters
+from .scope import Scope
+
+_KEYWORD_ONLY = sys.maxsize  # position of arguments passed by name only
+
+EMPTY = inspect.Parameter.empty
+
+
+class CallArgument(NamedTuple):
+    name: str
+    position: int
+    argument: Argument
+    default: Any  # EMPTY when required
+
+
+class CallPlan:
+    """Annotated parameters of a function which are resolved from a
+    container or a scope when the caller leaves them out.
+
+    Parameters with default values are injected only when the container
+    provides them. Positional-only and variadic parameters are never
+    injected.
+    """
+
+    __slots__ = ('function', 'arguments')
+
+    def __init__(self, function: Callable):
+        self.function = function
+
+        parameters = list(inspect.signature(function).parameters.values())
+        positions = {
+            param.name: index for index, param in enumerate(parameters)
+        }
+        arguments = []
+        for param, argument in plan_parameters(function, parameters):
+            if param.annotation is param.empty:
+                continue
+            if param.kind is param.POSITIONAL_ONLY:
+                continue
+            position = positions[param.name]
+            if param.kind is param.KEYWORD_ONLY:
+                position = _KEYWORD_ONLY
+            arguments.append(
+                CallArgument(param.name, position, argument, param.default)
+            )
+        self.arguments: Tuple[CallArgument, ...] = tuple(arguments)
+
+    def bind(
+        self,
+        target: Any,
+        args: Sequence[Any],
+        kwargs: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Add to `kwargs` the dependencies missing from the call, resolved
+        from `target`, a container or a scope."""
+        if isinstance(target, Scope):
+            container, scope = target._container, target
+        else:
+            container, scope = target, None
+
+        count = len(args)
+        for name, position, resolver, takes_scope in (
+            container._get_call_resolvers(self, scope is not None)
+        ):
+            if position < count or name in kwargs:
+                continue
+            kwargs[name] = resolver(scope) if takes_scope else resolver()
+        return kwargs
+
+
+def inject(container, function: Callable) -> Callable:
+    """Wrapper of `function`, a function, a coroutine function or a bound
+    method, resolving parameters left out by callers from `container`.
+
+    The wrapper is generated for the plan of `function`: calls passing
+    exactly the positional arguments before the first injected one call
+    the resolvers of all injected parameters directly, singletons are
+    passed as resolved after the last change of the container chain.
+    Other calls, and the first call after a change, bind arguments
+    through the plan.
+    """
+    plan = CallPlan(function)
+    positions = [
+        argument.position for argument in plan.arguments
+        if argument.position != _KEYWORD_ONLY
+    ]
+    positional = sum(
+        param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD)
+        for param in inspect.signature(function).parameters.values()
+    )
+    count = min(positions, default=positional)
+
+    # revision of the container chain, summed inline by the wrapper
+    chain = []
+    parent = container
+    while parent is not None:
+        chain.append(parent)
+        parent = parent._parent
+    state = [-1]  # revision the providers are resolved for
+    namespace = {
+        'function': function,
+        'state': state,
+        'current': overrides.current,
+    }
+    namespace.update(
+        (f'container_{index}', parent) for index, parent in enumerate(chain)
+    )
+    revision = ' + '.join(
+        f'container_{index}._revision' for index in range(len(chain))
+    )
+
+    def refresh():
+        current_revision = container._chain_revision()
+        resolvers = {
+            name: resolver
+            for name, _, resolver, _ in container._get_call_resolvers(
+                plan, False
+            )
+        }
+        for index, argument in enumerate(plan.arguments):
+            resolver = resolvers.get(argument.name)
+            if resolver is None:
+                provider = _constant(argument.default)
+            elif _is_singleton(container, argument.argument):
+                # rebuilt singletons change the revision
+                provider = _constant(resolver())
+            else:
+                provider = resolver
+            namespace[f'provider_{index}'] = provider
+        state[0] = current_revision
+
+    def slow(args, kwargs):
+        if (
+            container._chain_revision() != state[0]
+            and overrides.current() is None
+        ):
+            refresh()
+        plan.bind(container, args, kwargs)
+        return function(*args, **kwargs)
+
+    namespace['slow'] = slow
+
+    # indexing `args` and passing arguments by position where possible
+    # is notably cheaper than unpacking
+    arguments = [f'args[{index}]' for index in range(count)]
+    for index, argument in enumerate(plan.arguments):
+        if argument.position == len(arguments):
+            arguments.append(f'provider_{index}()')
+        else:
+            arguments.append(f'{argument.name}=provider_{index}()')
+    is_async = inspect.iscoroutinefunction(function)
+    await_ = 'await ' if is_async else ''
+    exec(
+        f'{"async " if is_async else ""}def injected(*args, **kwargs):\n'
+        f'    if (kwargs or len(args) != {count} or {revision} != state[0]\n'
+        f'            or current() is not None):\n'
+        f'        return {await_}slow(args, kwargs)\n'
+        f'    return {await_}function({", ".join(arguments)})\n',
+        namespace,
+    )
+
+    return functools.wraps(function)(namespace['injected'])
+
+
+def _constant(value: Any) -> Callable[[], Any]:
+    """Function returning `value`, without a Python frame per call."""
+    return itertools.repeat(value).__next__
+
+
+def _is_singleton(container, argument: Argument) -> bool:
+    source, owner, key = container._get_source(argument)
+    return (
+        source is Source.INJECTABLE and not argument.deferred
+        and owner.is_singleton(owner.get_injectable(key))
+    )
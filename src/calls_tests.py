@@ -0,0 +1,154 @@
+import asyncio
+import sys
+import pytest
+
+from . import exceptions
+from .calls import EMPTY, CallArgument, CallPlan
+from .container import Container
+from .plan import Argument
+
+
+class Settings:
+    pass
+
+
+class Session:
+    pass
+
+
+class Repository:
+    def __init__(self, session: Session):
+        self.session = session
+
+
+class Missing:
+    pass
+
+
+class Handler:
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+    def handle(self, request, repository: Repository, *,
+               settings: Settings, missing: Missing = None):
+        return self, request, repository, settings, missing
+
+
+def handle(request, repository: Repository, limit=10, *args,
+           settings: Settings = None, **kwargs):
+    pass
+
+
+@pytest.fixture()
+def f_container():
+    container = Container()
+    container.register(Settings, Settings, True)
+    container.register(Session, Session, False)
+    container.register(Repository, Repository, False)
+    return container
+
+
+def test_should_plan_injected_parameters():
+    assert CallPlan(handle).arguments == (
+        CallArgument(
+            'repository', 1, Argument('repository', Repository, (Repository,)),
+            EMPTY,
+        ),
+        CallArgument(
+            'settings', sys.maxsize,
+            Argument('settings', Settings, (Settings,)), None,
+        ),
+    )
+
+
+@pytest.mark.parametrize('compiled', [False, True])
+def test_should_inject_into_functions(f_container, compiled):
+    if compiled:
+        f_container.compile()
+
+    @f_container.inject
+    def handle(request, repository: Repository, *, settings: Settings,
+               missing: Missing = None):
+        return request, repository, settings, missing
+
+    for _ in range(2):  # binding, then the generated fast path
+        request, repository, settings, missing = handle('request')
+        assert request == 'request'
+        assert isinstance(repository.session, Session)
+        assert settings is f_container.get(Settings)
+        assert missing is None
+
+    explicit = Repository(Session())
+    assert handle('request', explicit)[1] is explicit
+    assert handle('request', repository=explicit)[1] is explicit
+    assert handle('request', settings='settings')[2] == 'settings'
+    assert handle.__name__ == 'handle'
+
+
+def test_should_inject_into_bound_methods(f_container):
+    handler = Handler(Settings())
+    handle = f_container.inject(handler.handle)
+
+    this, request, repository, settings, missing = handle('request')
+
+    assert this is handler
+    assert isinstance(repository, Repository)
+    assert settings is f_container.get(Settings)
+
+
+def test_should_inject_into_coroutine_functions(f_container):
+    @f_container.inject
+    async def handle(request, repository: Repository):
+        await asyncio.sleep(0)
+        return request, repository
+
+    request, repository = asyncio.run(handle('request'))
+
+    assert isinstance(repository, Repository)
+
+
+def test_should_follow_registration_changes(f_container):
+    @f_container.inject
+    def handle(missing: Missing = None):
+        return missing
+
+    assert handle() is None
+
+    f_container.register(Missing, Missing, True)
+
+    assert handle() is f_container.get(Missing)
+
+
+def test_should_inject_singletons_built_again_after_close(f_container):
+    @f_container.inject
+    def handle(settings: Settings):
+        return settings
+
+    settings = handle()
+    assert handle() is settings
+
+    f_container.close()
+
+    assert handle() is not settings
+    assert handle() is f_container.get(Settings)
+
+
+def test_should_honour_overrides(f_container):
+    @f_container.inject
+    def handle(settings: Settings):
+        return settings
+
+    handle()
+    settings = Settings()
+
+    with f_container.override({Settings: settings}):
+        assert handle() is settings
+
+
+def test_should_raise_for_missing_required_dependency():
+    @Container().inject
+    def handle(settings: Settings):
+        pass
+
+    with pytest.raises(exceptions.NonInjectableArgument):
+        handle()
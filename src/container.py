@@ -1,138 +1,1479 @@
+import asyncio
 import inspect
 import logging
-import typing
-from typing import Type, Dict, Union, Callable, Any, Optional, Hashable
+import os
+import threading
+import weakref
+import time
+from types import MappingProxyType
+from collections import defaultdict
+from concurrent import futures
+from contextlib import contextmanager
+from functools import partial
+from typing import (
+    Type, Dict, Union, Callable, Any, Optional, Hashable, List, Sequence, Set,
+    FrozenSet, Tuple, Mapping, Iterable, Iterator, TypeVar,
+)
 
-from . import exceptions
-from .injector import Injector
+from . import (
+    calls, disposal, exceptions, overrides, recipe, scan, snapshot,
+)
+from .injector import ForkPolicy, Injector, Registration, TForkPolicy
+from .lazy import Lazy
+from .plan import Argument, Source, TPlan, make_plan
+from .profiler import Profiler, active_profiler, profiling
+from .scope import Scope
+from .validation import ValidationReport, validate
 
 TProvider = Union[Type, Callable[[Type], Type]]
 TContext = Optional[Dict[Type, TProvider]]
+TResolver = Callable[[], Any]
+TNode = Tuple['Container', Type]
+TSource = Tuple[Source, 'Container', Any]
+TScopeResolver = Tuple[Callable, bool]
+TFunction = TypeVar('TFunction', bound=Callable)
+# name and position of an argument, its resolver and whether it takes
+# the scope
+TCallResolver = Tuple[str, int, Callable, bool]
 
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+ASYNC_INIT_HOOK = '__ainit__'
+
+
+class Context(dict):
+    """Container context which invalidates compiled resolvers on change."""
+
+    __slots__ = ('_container',)
+
+    def __init__(self, container: 'Container', *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._container = weakref.ref(container)
+
+    def _changed(self):
+        container = self._container()
+        if container is not None:
+            container._revision += 1
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._changed()
+        return value
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+
+def _make_constructor(
+    klass: Type,
+    providers: Sequence[Callable],
+    scoped: Optional[Sequence[bool]] = None,
+):
+    """Build `klass` from the results of `providers`.
+
+    When `scoped` is given, the built function takes a scope, which is
+    passed to the providers flagged in `scoped`.
+    """
+    namespace = {'klass': klass}
+    calls = []
+    for index, provider in enumerate(providers):
+        name = f'provider_{index}'
+        namespace[name] = provider
+        calls.append(f'{name}(scope)' if scoped and scoped[index] else
+                     f'{name}()')
+
+    parameter = 'scope' if scoped is not None else ''
+    exec(
+        f'def build({parameter}):\n    return klass({", ".join(calls)})\n',
+        namespace,
+    )
+
+    return namespace['build']
+
+
+def _none():
+    return None
+
+
+def _value(value: Any) -> Any:
+    return value
+
+
+async def _resolve_awaitable(value: Any) -> Any:
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+# Placeholders shared by containers until they store something, the
+# attributes are replaced on first write.
+_EMPTY_SET: FrozenSet = frozenset()
+_NO_CACHE: Mapping = MappingProxyType({})
+
+# Guards creation of per-container locks.
+_allocation_lock = threading.Lock()
+
 
 class Container(Injector):
-    _VAR_KIND_PARAMETER = object()
+    __slots__ = (
+        'trace', 'profiler', '_revision', '_instances', '_lock', '_locks',
+        '_futures', '_fork_forbidden', '_plans', '_compiled', '_frozen',
+        '_frozen_resolvers', '_frozen_scope_resolvers', '_cache_revision',
+        '_owners', '_sources', '_resolvers', '_scope_resolvers',
+        '_call_resolvers',
+        '_compiling', '_compiling_scope', '_context', '_parent',
+        '_placeholders',
+    )
 
     def __init__(
         self,
         context: TContext = None,
         parent: 'Container' = None,
+        trace: bool = False,
     ):
         super().__init__()
 
-        self._instances = dict()
-        self.context = context or {}
+        # Resolution is logged only when tracing is on, so the disabled
+        # case costs a single attribute check.
+        self.trace = trace
+        self.profiler: Optional[Profiler] = None
+
+        # Bumped on every change of registrations or context of this
+        # container which its and its children's caches depend on.
+        self._revision = 0
+
+        # Storage below is allocated on first write, see `_writable`.
+        self._instances: Mapping[Hashable, Any] = _NO_CACHE
+        self._lock: Optional[threading.Lock] = None
+        self._locks: Mapping[Hashable, threading.RLock] = _NO_CACHE
+        self._futures: Mapping[Hashable, asyncio.Future] = _NO_CACHE
+        # Singletons built before a fork with the FORBID policy.
+        self._fork_forbidden: FrozenSet[Hashable] = _EMPTY_SET
+        self._plans: Mapping[Type, TPlan] = _NO_CACHE
+        # Keys of scanned classes not imported yet by their import paths.
+        self._placeholders: Mapping[str, Hashable] = _NO_CACHE
+        self._compiled = False
+        self._frozen = False
+        self._frozen_resolvers: Optional[Mapping[Hashable, TResolver]] = None
+        self._frozen_scope_resolvers: Optional[
+            Mapping[Hashable, TScopeResolver]
+        ] = None
+        # Caches below are valid for `_cache_revision` of the chain only,
+        # they are created by `_refresh_caches` on first use.
+        self._cache_revision = -1
+        self._owners: Mapping[Hashable, Container] = _NO_CACHE
+        self._sources: Mapping[Argument, TSource] = _NO_CACHE
+        self._resolvers: Mapping[Hashable, TResolver] = _NO_CACHE
+        self._scope_resolvers: Mapping[Hashable, TScopeResolver] = _NO_CACHE
+        self._call_resolvers: Mapping[
+            Tuple[calls.CallPlan, bool], Tuple[TCallResolver, ...]
+        ] = _NO_CACHE
+        self._compiling: FrozenSet[Type] = _EMPTY_SET
+        self._compiling_scope: FrozenSet[Type] = _EMPTY_SET
+        # nothing has compiled against a new context yet
+        self._context: Mapping[Type, TProvider] = (
+            Context(self, context) if context else _NO_CACHE
+        )
         self._parent = parent
 
+    @property
+    def context(self) -> Context:
+        if self._context is _NO_CACHE and not self._frozen:
+            self._context = Context(self)
+        return self._context
+
+    @context.setter
+    def context(self, context: Dict[Type, TProvider]):
+        self._check_not_frozen()
+        self._context = Context(self, context)
+        self._revision += 1
+
+    def register(
+        self,
+        key: Hashable,
+        klass: Type,
+        singleton: bool,
+        scoped: bool = False,
+        fork_policy: TForkPolicy = ForkPolicy.SHARE,
+    ) -> Type:
+        self._check_not_frozen()
+        if klass in self._plans:
+            del self._plans[klass]
+        self._revision += 1
+        super().register(key, klass, singleton, scoped, fork_policy)
+
+        if ForkPolicy(fork_policy) is not ForkPolicy.SHARE:
+            _fork_aware.add(self)
+
+        return klass
+
+    def reset(self):
+        self._check_not_frozen()
+        super().reset()
+        self._plans = _NO_CACHE
+        self._placeholders = _NO_CACHE
+        self._revision += 1
+
+    def scope(self) -> Scope:
+        """New scope for services registered with `scoped=True`."""
+        return Scope(self)
+
+    def close(self):
+        """Close singletons built by this container.
+
+        Instances exposing `close` or the context manager protocol are
+        closed in reverse construction order and forgotten, so they are
+        built again on next access.
+        """
+        disposal.close_all(list(self._pop_instances().values()))
+
+    async def aclose(self):
+        """Close singletons awaiting `aclose` and async context managers.
+
+        Instances are closed concurrently, each one after the singletons
+        depending on it.
+        """
+        instances = self._pop_instances()
+        keys = list(instances)
+        indexes = {key: index for index, key in enumerate(keys)}
+
+        dependencies = {}
+        for index, key in enumerate(keys):
+            if not self.is_injectable(key):
+                continue
+            klass = self.get_injectable(key)
+            dependencies[index] = {
+                indexes[dependency]
+                for container, dependency in self._node_dependencies(
+                    klass, set()
+                )
+                if container is self and dependency in indexes
+            }
+
+        await disposal.aclose_all(list(instances.values()), dependencies)
+
+    def _pop_instances(self) -> Dict[Hashable, Any]:
+        with self._get_container_lock():
+            instances = dict(self._instances)
+            self._instances = _NO_CACHE
+        self._revision += 1  # drop instances held by compiled resolvers
+        return instances
+
+    def compile(self):
+        """Switch `get` to specialized resolver functions.
+
+        Every registered key gets a function which calls dependency
+        resolvers and the constructor directly. Resolvers are rebuilt
+        lazily after any registration or context change in the tree,
+        anything which can't be specialized uses the dynamic path.
+        """
+        self._compiled = True
+
+        for key in list(self._registrations):
+            self._get_resolver(key)
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self):
+        """Seal registrations and context and precompute resolution.
+
+        Registrations and context become read-only mappings, constructor
+        plans and resolvers of every key of the container chain are built
+        once into immutable tables, so `get` and scopes read them without
+        locks or invalidation. `register`, `reset` and replacing the
+        context raise `FrozenContainer` afterwards. Parents must be frozen
+        first, children of a frozen container share its tables.
+        """
+        if self._frozen:
+            return
+        if self._parent is not None and not self._parent.frozen:
+            raise exceptions.InjectionError(
+                'parent containers must be frozen first'
+            )
+
+        self._load_placeholders()
+
+        self._registrations = MappingProxyType(dict(self._registrations))
+        self._context = MappingProxyType(dict(self._context))
+        self._frozen = True
+        self._compiled = True
+
+        keys = []
+        container = self
+        while container is not None:
+            keys.extend(container._registrations)
+            container = container._parent
+
+        for key in self._registrations:
+            klass = self.get_injectable(self.get_injectable(key))
+            if klass not in self._context:
+                self._get_plan(klass)
+
+        self._refresh_caches()
+        self._frozen_resolvers = MappingProxyType({
+            key: self._get_resolver(key) for key in keys
+        })
+        self._frozen_scope_resolvers = MappingProxyType({
+            key: self._get_scope_resolver(key) for key in keys
+        })
+
+    def _after_fork_in_child(self):
+        """Apply fork policies to singletons inherited from the parent
+        process and drop locks which may be held by its other threads."""
+        self._lock = None
+        self._locks = _NO_CACHE
+        self._futures = _NO_CACHE
+
+        dropped = False
+        for key in list(self._instances):
+            policy = self.get_fork_policy(key)
+            if policy is ForkPolicy.SHARE:
+                continue
+            del self._instances[key]
+            dropped = True
+            if policy is ForkPolicy.FORBID:
+                self._fork_forbidden = self._fork_forbidden | {key}
+
+        if dropped:
+            self._revision += 1  # drop instances held by compiled resolvers
+
+    def _check_not_frozen(self):
+        if self._frozen:
+            raise exceptions.FrozenContainer(
+                'container is frozen and can not be changed'
+            )
+
+    def snapshot(self, path: str) -> List[Hashable]:
+        """Store registrations with their constructor plans at `path`.
+
+        Returns keys which can't be stored, see `snapshot.dump`.
+        """
+        self._load_placeholders()
+        return snapshot.dump(self, path)
+
+    def restore(self, path: str) -> List[Hashable]:
+        """Register entries stored by `snapshot` reusing their plans.
+
+        Returns keys whose source changed or can't be imported anymore
+        since the snapshot was taken, see `snapshot.load`.
+        """
+        return snapshot.load(self, path)
+
+    def export_recipe(self) -> recipe.Recipe:
+        """Picklable description of this container and its parents.
+
+        Registrations go by import path, context values only when they
+        can be pickled; whatever is left out is listed in `skipped`.
+        """
+        self._load_placeholders()
+        return recipe.export(self)
+
+    @classmethod
+    def from_recipe(cls, container_recipe: recipe.Recipe) -> 'Container':
+        """Container built from `export_recipe` output, once per process
+        and recipe, e.g. in process pool workers."""
+        return recipe.build(container_recipe, cls)
+
+    def scan(
+        self,
+        package: str,
+        decorators: Sequence[str] = ('injectable',),
+        manifest: Optional[str] = None,
+    ) -> List[Hashable]:
+        """Register classes of `package` decorated with a call of one of
+        `decorators` without importing them.
+
+        Each class is registered under the key given to its decorator, or
+        its import path ``module:qualname``, with a placeholder, which
+        imports the module and registers the class on first resolution of
+        the key or of the class itself.
+        Decorator arguments must be literals, other classes are skipped.
+        With `manifest`, the index is read from this file when it exists
+        and written to it otherwise. Returns the registered keys.
+        """
+        self._check_not_frozen()
+        if manifest is not None and os.path.exists(manifest):
+            entries = scan.load(manifest)
+        else:
+            entries = scan.index(package, decorators)
+            if manifest is not None:
+                scan.dump(entries, manifest)
+
+        keys = []
+        for entry in entries:
+            key = entry.registration_key
+            if self.is_injectable(key):
+                continue  # already imported or registered
+            self._writable_registrations()[key] = Registration(
+                scan.Placeholder(entry.path), entry.singleton, entry.scoped,
+                entry.fork_policy,
+            )
+            self._writable('_placeholders')[entry.path] = key
+            keys.append(key)
+        self._revision += 1
+        return keys
+
+    def _is_placeholder(self, key: Hashable) -> bool:
+        registration = self._registrations.get(key)
+        return registration is not None and isinstance(
+            registration.klass, scan.Placeholder
+        )
+
+    def _load_placeholder(self, key: Hashable):
+        """Import the class registered with a placeholder under `key`."""
+        registration = self._registrations[key]
+        klass = registration.klass.load()
+        if self._placeholders.get(registration.klass.path) == key:
+            del self._placeholders[registration.klass.path]
+
+        if self._registrations.get(key) is registration:
+            # not registered by its decorator on import
+            self.register(
+                key, klass, registration.singleton, registration.scoped,
+                registration.fork_policy,
+            )
+
+    def _load_scanned_class(self, key: Hashable) -> bool:
+        """Load the placeholder of class `key` imported by other code,
+        whether it's registered now."""
+        if not self._placeholders or not isinstance(key, type):
+            return False
+
+        placeholder_key = self._placeholders.get(
+            f'{key.__module__}:{key.__qualname__}'
+        )
+        if placeholder_key is None or not self._is_placeholder(
+            placeholder_key
+        ):
+            return False
+
+        self._load_placeholder(placeholder_key)
+        return self.is_injectable(key)
+
+    def _load_placeholders(self):
+        container = self
+        while container is not None:
+            for key in list(container._registrations):
+                if container._is_placeholder(key):
+                    container._load_placeholder(key)
+            container = container._parent
+
+    def validate(self) -> ValidationReport:
+        """Report missing arguments and dependency cycles of every class
+        registered in this container and its parents, without building
+        anything.
+        """
+        self._load_placeholders()
+        return validate(self)
+
     def get(
         self,
         key: Hashable,
         context: TContext = None
     ):
-        context = context or {}
+        """Resolve `key`, with `context` overriding the context of every
+        container for the whole resolution, see `override`."""
+        if context:
+            token = overrides.push(context)
+            try:
+                return self._get_dynamic(key, context)
+            finally:
+                overrides.pop(token)
+
+        if (
+            self._compiled and self.profiler is None
+            and overrides.current() is None
+        ):
+            return self._get_resolver(key)()
+
+        return self._get_dynamic(key, context)
 
+    def inject(self, function: TFunction) -> TFunction:
+        """Decorator resolving annotated parameters of a function, a
+        coroutine function or a bound method from this container when
+        callers leave them out.
+
+        The call plan is built once, on decoration; parameters with
+        default values are injected only when the container provides
+        them.
+        """
+        return calls.inject(self, function)
+
+    @contextmanager
+    def override(self, context: Dict[Hashable, TProvider]) -> Iterator[None]:
+        """Resolve with `context` over the context of every container
+        within the block.
+
+        Values are injected as is, functions are called with the
+        resolving container, as with the regular context; keys of
+        registered services are overridden as well. Overrides nest and
+        are local to the current thread or asyncio task, tasks created
+        within the block inherit them. Singletons are built without
+        overrides, and resolvers bound earlier, such as `Provider` and
+        `Lazy` arguments or scopes, don't see them.
+        """
+        token = overrides.push(context)
         try:
-            klass = self.get_injectable(key)
-            return self._get(klass)
-        except exceptions.NonInjectableClass:
-            parent_context = {
-                **self.context,
-                **context
-            }
+            yield
+        finally:
+            overrides.pop(token)
+
+    def get_many(
+        self,
+        keys: Iterable[Hashable],
+        memoize: bool = False
+    ) -> List[Any]:
+        """Resolve `keys` in one pass, looking up each distinct key once.
+
+        With `memoize` every service is built at most once per batch, so
+        transient dependencies shared by several keys are shared by the
+        resolved instances as well. Without it, compiled containers only
+        save the per-call checks of `get`.
+        """
+        if self.profiler is not None and active_profiler() is None:
+            with profiling(self.profiler):
+                return self.get_many(keys, memoize)
+
+        if memoize:
+            memo: dict = {}
+            return [self._get_memoized(key, memo) for key in keys]
+
+        if (
+            self._compiled and self.profiler is None
+            and overrides.current() is None
+        ):
+            return self._get_many_compiled(keys)
+
+        resolvers: Dict[Hashable, TResolver] = {}
+        instances = []
+        for key in keys:
+            resolver = resolvers.get(key)
+            if resolver is None:
+                resolver = resolvers[key] = self._get_batch_resolver(key)
+            instances.append(resolver())
+        return instances
+
+    def get_dict(
+        self,
+        keys: Iterable[Hashable],
+        memoize: bool = False
+    ) -> Dict[Hashable, Any]:
+        """Like `get_many` but returns instances by their keys."""
+        keys = list(dict.fromkeys(keys))
+        return dict(zip(keys, self.get_many(keys, memoize)))
+
+    def _get_many_compiled(self, keys: Iterable[Hashable]) -> List[Any]:
+        """`get_many` reading compiled resolvers straight from the cache,
+        checked for changes of the chain once per batch."""
+        self._refresh_caches()
+        resolvers = self._frozen_resolvers or self._resolvers
+        get_resolver = self._get_resolver
+        return [(resolvers.get(key) or get_resolver(key))() for key in keys]
+
+    def _get_batch_resolver(self, key: Hashable) -> TResolver:
+        if overrides.current() is not None:
+            return partial(self._get_dynamic, key)
+
+        owner = self._get_owner(key)
+        if owner is None or self.trace or self.profiler is not None:
+            return partial(self._get_dynamic, key)
+
+        return partial(owner._get, owner.get_injectable(key))
+
+    def _get_memoized(self, key: Hashable, memo: dict):
+        """Instance of `key` built at most once per `memo`."""
+        owner = self._get_owner(key)
+        if owner is None or overrides.current() is not None:
+            return self._get_dynamic(key)
 
-            logging.debug(
-                'getting key=%s, context=%s',
-                key, parent_context
+        klass = owner.get_injectable(key)
+        try:
+            return memo[owner, klass]
+        except KeyError:
+            profiler = active_profiler()
+            if profiler is not None:
+                profiler.record_depth(key, self._depth(owner))
+            instance = memo[owner, klass] = owner._get(klass, memo)
+            return instance
+
+    def profile(self, profiler: Optional[Profiler] = None) -> Profiler:
+        """Record resolution statistics of this container, including what
+        it resolves from its parents.
+
+        The profiler is attached to this container only, resolutions
+        started from parents or siblings aren't recorded. Profiled
+        containers resolve through the dynamic path, set `profiler` to
+        None to detach it.
+        """
+        self.profiler = profiler or Profiler()
+        return self.profiler
+
+    def _depth(self, container: 'Container') -> int:
+        """Number of parent hops from this container to `container`."""
+        depth, current = 0, self
+        while current is not container:
+            current = current._parent
+            depth += 1
+        return depth
+
+    def _get_dynamic(
+        self,
+        key: Hashable,
+        context: TContext = None
+    ):
+        if self.profiler is not None and active_profiler() is None:
+            with profiling(self.profiler):
+                return self._get_dynamic(key, context)
+
+        layer = overrides.current()
+        if layer is not None:
+            override = layer.find(key)
+            if override is not None:
+                return self._provide(*override)
+
+        owner = self._get_owner(key)
+        if owner is None:
+            raise exceptions.NonInjectableClass(
+                f'{key} is non injectable or missing',
+                key
             )
 
-            if self._parent:
-                return self._parent.get(key, parent_context)
-            raise
+        if owner is not self and self.trace:
+            logger.debug(
+                'getting key=%s from parent, context=%s',
+                key, context
+            )
 
-    def _get(self, key: Hashable):
-        if not self.is_singleton(key):
-            klass = self.get_injectable(key)
-            return self._instantiate(klass)
+        profiler = active_profiler()
+        if profiler is not None:
+            profiler.record_depth(key, self._depth(owner))
 
-        if key not in self._instances:
-            klass = self.get_injectable(key)
-            self._instances[key] = self._instantiate(klass)
+        return owner._get(owner.get_injectable(key))
 
-        return self._instances[key]
+    def _chain_revision(self) -> int:
+        """Sum of revisions of this container and its parents.
 
-    def _instantiate(self, key: Type) -> Any:
-        if key in self.context:
-            return self.context[key](self)
+        Revisions only grow, so the sum changes whenever any container of
+        the chain changes, while changes of children and siblings don't
+        affect it.
+        """
+        revision = self._revision
+        parent = self._parent
+        while parent is not None:
+            revision += parent._revision
+            parent = parent._parent
+        return revision
+
+    def _refresh_caches(self):
+        revision = self._chain_revision()
+        if self._cache_revision != revision:
+            self._owners = {}
+            self._sources = {}
+            self._resolvers = {}
+            self._scope_resolvers = {}
+            self._call_resolvers = {}
+            self._cache_revision = revision
+
+    def _get_owner(self, key: Hashable) -> Optional['Container']:
+        """Nearest container of the chain where `key` is registered."""
+        self._refresh_caches()
+
+        try:
+            return self._owners[key]
+        except KeyError:
+            owner = self
+            while owner is not None and not owner.is_injectable(key):
+                if owner._load_scanned_class(key):
+                    return self._get_owner(key)
+                owner = owner._parent
+            if owner is None:
+                return None  # misses aren't cached, keys are unbounded
+            if owner._is_placeholder(key):
+                owner._load_placeholder(key)
+                return self._get_owner(key)
+            self._owners[key] = owner
+            return owner
+
+    def _provide(self, source: Source, value: Any) -> Any:
+        if source is Source.FACTORY:
+            return value(self)
+        return value
+
+    def _get_source(self, argument: Argument) -> TSource:
+        """Where the chain takes a value for `argument` from."""
+        layer = overrides.current()
+        if layer is not None:
+            for annotation in argument.types:
+                override = layer.find(annotation)
+                if override is not None:
+                    return override[0], self, override[1]
+
+        self._refresh_caches()
+
+        try:
+            return self._sources[argument]
+        except KeyError:
+            source = self._sources[argument] = self._find_source(argument)
+            return source
+
+    def _find_source(self, argument: Argument) -> TSource:
+        container = self
+        while container is not None:
+            for annotation in argument.types:
+                if annotation in container._context:
+                    value = container._context[annotation]
+                    if inspect.isfunction(value):
+                        return Source.FACTORY, container, value
+                    return Source.VALUE, container, value
+                if (
+                    container.is_injectable(annotation)
+                    or container._load_scanned_class(annotation)
+                ):
+                    return Source.INJECTABLE, container, annotation
+                elif annotation is None.__class__:  # optional argument
+                    return Source.NONE, container, None
+            container = container._parent
+
+        return Source.MISSING, self, None
+
+    def _get(self, key: Hashable, memo: Optional[dict] = None):
+        registration = self.get_registration(key)
+        klass = registration.klass
+
+        if registration.scoped:
+            raise exceptions.ScopeError(
+                f'{key} is scoped and must be resolved from a scope', key
+            )
+
+        profiler = active_profiler()
+        if profiler is not None:
+            profiler.record_resolution(key, key in self._instances)
+
+        if not registration.singleton:
+            return self._instantiate(klass, memo)
+
+        return self._get_singleton(
+            key, partial(self._instantiate, klass, memo)
+        )
+
+    def _get_singleton(self, key: Hashable, build: TResolver):
+        instance = self._instances.get(key, _MISSING)
+        if instance is not _MISSING:
+            return instance
+
+        with self._get_lock(key):
+            instance = self._instances.get(key, _MISSING)
+            if instance is _MISSING:
+                self._check_fork_allowed(key)
+                token = overrides.isolate()
+                try:
+                    instance = build()
+                finally:
+                    overrides.pop(token)
+                with self._get_container_lock():
+                    self._writable('_instances')[key] = instance
+                    if key in self._locks:
+                        del self._locks[key]
+
+        return instance
+
+    def _check_fork_allowed(self, key: Hashable):
+        if key in self._fork_forbidden:
+            raise exceptions.ForkError(
+                f'{key} was built before fork and must not be used in a '
+                f'child process', key
+            )
+
+    def _get_lock(self, key: Hashable) -> threading.RLock:
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._get_container_lock():
+                lock = self._writable('_locks').setdefault(
+                    key, threading.RLock()
+                )
+        return lock
+
+    def _get_container_lock(self) -> threading.Lock:
+        lock = self._lock
+        if lock is None:
+            with _allocation_lock:
+                lock = self._lock
+                if lock is None:
+                    lock = self._lock = threading.Lock()
+                    _locking.add(self)
+        return lock
+
+    def _writable(self, name: str) -> dict:
+        """Storage attribute `name`, allocated when it's still the shared
+        placeholder."""
+        storage = getattr(self, name)
+        if storage is _NO_CACHE:
+            storage = {}
+            setattr(self, name, storage)
+        return storage
+
+    def _instantiate(self, key: Type, memo: Optional[dict] = None) -> Any:
+        profiler = active_profiler()
+        if profiler is not None:
+            return profiler.instantiate(
+                key, partial(self._construct, memo=memo)
+            )
+
+        return self._construct(key, memo)
+
+    def _construct(self, key: Type, memo: Optional[dict] = None) -> Any:
+        if key in self._context:
+            return self._context[key](self)
 
         if not self.is_injectable(key):
             raise exceptions.NonInjectableClass(
                 f'{key} is non injectable', key
             )
 
-        parameters = inspect.signature(key.__init__).parameters
-        args = list(parameters.values())[1:]
         args = [
-            self._get_argument(arg, key) for arg in args
+            self._get_argument(argument, key, memo)
+            for argument in self._get_plan(key)
         ]
-        args = list(filter(
-            lambda it: it is not self._VAR_KIND_PARAMETER, args
-        ))
 
         instance = key(*args)
 
-        logger.debug(
-            'instantiate klass=%s, args=%s, instance=%s',
-            key, args, instance
+        if self.trace:
+            logger.debug(
+                'instantiate klass=%s, args=%s, instance=%s',
+                key, args, instance
+            )
+
+        return instance
+
+    def _get_plan(self, key: Type) -> TPlan:
+        try:
+            return self._plans[key]
+        except KeyError:
+            plan = make_plan(key)
+            self._set_plan(key, plan)
+            return plan
+
+    def _set_plan(self, key: Type, plan: TPlan):
+        self._writable('_plans')[key] = plan
+
+    def _get_argument(
+        self,
+        argument: Argument,
+        key: Type,
+        memo: Optional[dict] = None
+    ):
+        if argument.lazy and self._is_provided(argument):
+            return Lazy(partial(self._resolve_argument, argument, key, memo))
+        if argument.provider:
+            provider = self._compile_source(argument)
+            if provider is not None:
+                return provider
+
+        return self._resolve_argument(argument, key, memo)
+
+    def _is_provided(self, argument: Argument) -> bool:
+        return self._get_source(argument)[0] is not Source.MISSING
+
+    def _resolve_argument(
+        self,
+        argument: Argument,
+        key: Type,
+        memo: Optional[dict] = None
+    ):
+        source, container, value = self._get_source(argument)
+
+        if source is Source.INJECTABLE:
+            profiler = active_profiler()
+            if profiler is not None:
+                profiler.record_depth(value, self._depth(container))
+            if memo is not None:
+                return container._get_memoized(value, memo)
+            if profiler is not None:
+                return container._get_dynamic(value)
+            return container.get(value)
+
+        if self.trace and source is not Source.MISSING:
+            logger.debug(
+                'use context=%s, key=%s, param=%s',
+                container._context,
+                key,
+                argument.name,
+            )
+
+        if source is Source.FACTORY:
+            return value(container)
+        elif source is Source.VALUE:
+            return value
+        elif source is Source.NONE:
+            return None
+
+        raise exceptions.NonInjectableArgument(
+            'Non injectable argument',
+            key,
+            argument.name,
+            argument.annotation
         )
 
+    async def aget(
+        self,
+        key: Hashable,
+        context: TContext = None
+    ):
+        """Resolve `key` awaiting async factories and init hooks.
+
+        Context factories may return awaitables, instances exposing an
+        `__ainit__` coroutine method are awaited after construction.
+        Independent constructor arguments are resolved concurrently and
+        concurrent first access of a singleton shares one construction.
+        `context` overrides the context as in `get`.
+        """
+        if context:
+            token = overrides.push(context)
+            try:
+                return await self._aget_overridden(key)
+            finally:
+                overrides.pop(token)
+
+        return await self._aget_overridden(key)
+
+    async def _aget_overridden(self, key: Hashable):
+        layer = overrides.current()
+        if layer is not None:
+            override = layer.find(key)
+            if override is not None:
+                return await _resolve_awaitable(self._provide(*override))
+
+        return await self._aget_key(key, frozenset())
+
+    async def _aget_key(self, key: Hashable, path: FrozenSet[Type]):
+        owner = self._get_owner(key)
+        if owner is not self:
+            if owner is None:
+                self.get_injectable(key)  # raises NonInjectableClass
+            return await owner._aget_key(key, path)
+
+        klass = self.get_injectable(key)
+        if self.is_scoped(klass):
+            self._get(klass)  # raises ScopeError
+
+        if klass in path:
+            raise RecursionError(f'circular dependency on {klass}')
+
+        build = partial(
+            self._ainstantiate, self.get_injectable(klass), path | {klass}
+        )
+
+        if not self.is_singleton(klass):
+            return await build()
+
+        instance = self._instances.get(klass, _MISSING)
+        if instance is not _MISSING:
+            return instance
+
+        future = self._futures.get(klass)
+        if future is None:
+            self._check_fork_allowed(klass)
+            future = asyncio.ensure_future(
+                self._abuild_singleton(klass, build)
+            )
+            self._writable('_futures')[klass] = future
+        return await asyncio.shield(future)
+
+    async def _abuild_singleton(self, key: Hashable, build):
+        overrides.isolate()  # runs in a task of its own
+        try:
+            instance = await build()
+            with self._get_container_lock():
+                return self._writable('_instances').setdefault(key, instance)
+        finally:
+            if key in self._futures:
+                del self._futures[key]
+
+    async def _ainstantiate(self, key: Type, path: FrozenSet[Type]) -> Any:
+        if key in self._context:
+            return await _resolve_awaitable(self._context[key](self))
+
+        arguments = [
+            self._aget_argument(argument, key, path)
+            for argument in self._get_plan(key)
+        ]
+        if len(arguments) > 1:
+            args = await asyncio.gather(*arguments)
+        else:
+            args = [await argument for argument in arguments]
+
+        instance = key(*args)
+
+        init_hook = getattr(instance, ASYNC_INIT_HOOK, None)
+        if init_hook is not None:
+            await init_hook()
+
+        if self.trace:
+            logger.debug(
+                'instantiate klass=%s, args=%s, instance=%s',
+                key, args, instance
+            )
+
         return instance
 
-    def _get_argument(self, param: inspect.Parameter, key: Type):
-        annotations = self.__extract_types(param)
+    async def _aget_argument(
+        self,
+        argument: Argument,
+        key: Type,
+        path: FrozenSet[Type],
+    ):
+        if argument.deferred and self._is_provided(argument):
+            # resolved later through the synchronous path
+            return self._get_argument(argument, key)
 
-        if param.kind in (
-            inspect.Parameter.VAR_POSITIONAL,
-            inspect.Parameter.VAR_KEYWORD,
-        ):
-            return self._VAR_KIND_PARAMETER
-
-        for annotation in annotations:
-            if annotation in self.context:
-                logger.debug(
-                    'use context=%s, key=%s, param=%s',
-                    self.context,
-                    key,
-                    param,
-                )
-                if inspect.isfunction(self.context[annotation]):
-                    return self.context[annotation](self)
-                else:
-                    return self.context[annotation]
-            if self.is_injectable(annotation):
-                return self.get(annotation)
-            elif annotation is None.__class__:  # optional argument
-                return None
-
-        if self._parent:
-            return self._parent._get_argument(param, key)
+        source, container, value = self._get_source(argument)
+
+        if source is Source.INJECTABLE:
+            return await container._aget_key(value, path)
+        elif source is Source.FACTORY:
+            return await _resolve_awaitable(value(container))
+        elif source is Source.VALUE:
+            return value
+        elif source is Source.NONE:
+            return None
 
         raise exceptions.NonInjectableArgument(
             'Non injectable argument',
             key,
-            param.name,
-            param.annotation
+            argument.name,
+            argument.annotation
+        )
+
+    def warm_up(self, max_workers: Optional[int] = None) -> Dict[Type, float]:
+        """Eagerly build every singleton of this container and its parents.
+
+        Singletons are built in dependency order on a thread pool, each one
+        as soon as all singletons it depends on are ready. Returns the build
+        time in seconds per singleton class.
+        """
+        graph = self._singleton_graph()
+        pending = {node: set(dependencies) for node, dependencies in graph}
+        dependents = defaultdict(list)
+        for node, dependencies in graph:
+            for dependency in dependencies:
+                dependents[dependency].append(node)
+
+        timings = {}
+        with futures.ThreadPoolExecutor(max_workers) as executor:
+            running = {}
+            while True:
+                ready = [node for node, deps in pending.items() if not deps]
+                for node in ready:
+                    del pending[node]
+                    running[executor.submit(_warm_up_node, node)] = node
+                if not running:
+                    break
+
+                done, _ = futures.wait(
+                    running, return_when=futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    node = running.pop(future)
+                    timings[node[1]] = future.result()
+                    for dependent in dependents[node]:
+                        pending[dependent].discard(node)
+
+        for node in pending:  # circular dependencies, raises RecursionError
+            timings[node[1]] = _warm_up_node(node)
+
+        return timings
+
+    async def awarm_up(self) -> Dict[Type, float]:
+        """Asyncio variant of `warm_up` resolving singletons with `aget`."""
+        graph = self._singleton_graph()
+        tasks = {}
+        timings = {}
+
+        async def build(node: TNode, dependencies: Sequence[asyncio.Future]):
+            await asyncio.gather(*dependencies)
+            container, klass = node
+            started = time.perf_counter()
+            await container._aget_key(klass, frozenset())
+            timings[klass] = time.perf_counter() - started
+
+        for node, dependencies in graph:
+            tasks[node] = asyncio.ensure_future(build(node, [
+                tasks[dependency]
+                for dependency in dependencies if dependency in tasks
+            ]))
+        await asyncio.gather(*tasks.values())
+
+        return timings
+
+    def _singleton_graph(self) -> List[Tuple[TNode, Set[TNode]]]:
+        """Singletons of the container chain with their singleton
+        dependencies, topologically ordered as far as the graph allows.
+        """
+        self._load_placeholders()
+        graph = {}
+        container = self
+        while container:
+            for key, registration in list(container._registrations.items()):
+                klass = registration.klass
+                if registration.singleton and container.is_singleton(klass):
+                    graph[container, klass] = container._node_dependencies(
+                        container.get_injectable(klass), set()
+                    )
+            container = container._parent
+
+        ordered = {}
+
+        def visit(node: TNode, path: Set[TNode]):
+            if node in ordered or node in path:
+                return
+            path.add(node)
+            for dependency in graph.get(node, ()):
+                visit(dependency, path)
+            path.discard(node)
+            ordered[node] = graph.get(node, set())
+
+        for node in graph:
+            visit(node, set())
+
+        return list(ordered.items())
+
+    def _node_dependencies(self, klass: Type, seen: Set[Type]) -> Set[TNode]:
+        if klass in self._context:
+            return set()
+
+        dependencies = set()
+        for argument in self._get_plan(klass):
+            dependencies |= self._argument_dependencies(argument, seen)
+        return dependencies
+
+    def _argument_dependencies(
+        self,
+        argument: Argument,
+        seen: Set[Type],
+    ) -> Set[TNode]:
+        source, container, key = self._get_source(argument)
+        if source is not Source.INJECTABLE or argument.deferred:
+            return set()
+
+        klass = container.get_injectable(key)
+        if container.is_singleton(klass):
+            return {(container, klass)}
+        if klass in seen:
+            return set()
+
+        seen.add(klass)
+        return container._node_dependencies(
+            container.get_injectable(klass), seen
+        )
+
+    def _get_resolver(self, key: Hashable) -> TResolver:
+        frozen = self._frozen_resolvers
+        if frozen is not None and key in frozen:
+            return frozen[key]
+
+        self._refresh_caches()
+
+        try:
+            return self._resolvers[key]
+        except KeyError:
+            if self._get_owner(key) is None:
+                return partial(self._get_dynamic, key)  # not cached
+            resolver = self._resolvers[key] = self._compile(key)
+            return resolver
+
+    def _compile(self, key: Hashable) -> TResolver:
+        owner = self._get_owner(key)
+        if owner is not self:
+            if owner is None:
+                return partial(self._get_dynamic, key)
+            return owner._get_resolver(key)
+
+        klass = self.get_injectable(key)
+        if klass in self._compiling or self.is_scoped(klass):
+            # circular dependency or a scoped service outside of a scope
+            return partial(self._get, klass)
+
+        self._compiling = self._compiling | {klass}
+        try:
+            build = self._compile_build(self.get_injectable(klass))
+        finally:
+            self._compiling = self._compiling - {klass}
+
+        if not self.is_singleton(klass):
+            return build
+
+        if self._frozen:  # instances may be closed, tables stay
+            return partial(self._get_singleton, klass, build)
+
+        instance = _MISSING
+
+        def resolve():
+            nonlocal instance
+            if instance is _MISSING:
+                instance = self._get_singleton(klass, build)
+            return instance
+
+        return resolve
+
+    def _get_provider(self, key: Hashable) -> TResolver:
+        """Resolver of `key` for `Provider` arguments.
+
+        Providers outlive compiled resolvers, so singletons are looked up
+        in the instances of their owner on every call and are built again
+        after closing or forking like with `get`.
+        """
+        resolver = self._get_resolver(key)
+        owner = self._get_owner(key)
+        if owner is None or owner._frozen:
+            return resolver
+
+        klass = owner.get_injectable(key)
+        if not owner.is_singleton(klass):
+            return resolver
+        return partial(
+            owner._get_singleton, klass,
+            partial(owner._instantiate, owner.get_injectable(klass)),
         )
 
-    def __extract_types(
-        self, param: inspect.Parameter,
-    ) -> typing.Tuple[Type, ...]:
-        if hasattr(param.annotation, '__args__'):
-            return param.annotation.__args__
+    def _compile_build(self, klass: Type) -> TResolver:
+        if klass in self._context:
+            return partial(self._context[klass], self)
+
+        return _make_constructor(klass, [
+            self._compile_argument(argument, klass)
+            for argument in self._get_plan(klass)
+        ])
+
+    def _compile_argument(self, argument: Argument, key: Type) -> TResolver:
+        resolver = self._compile_source(argument)
+
+        if resolver is None:
+            return partial(self._get_argument, argument, key)
+        if argument.lazy:
+            return partial(Lazy, resolver)
+        if argument.provider:
+            return partial(_value, resolver)
+        return resolver
+
+    def _compile_source(self, argument: Argument) -> Optional[TResolver]:
+        """Resolver of the value of `argument`, None when it's missing."""
+        source, container, value = self._get_source(argument)
+
+        if source is Source.INJECTABLE:
+            if argument.provider:
+                return container._get_provider(value)
+            return container._get_resolver(value)
+        elif source is Source.FACTORY:
+            return partial(value, container)
+        elif source is Source.VALUE:
+            return partial(_value, value)
+        elif source is Source.NONE:
+            return _none
+
+        return None
+
+    def _get_scope_resolver(self, key: Hashable) -> TScopeResolver:
+        """Resolver of `key` for scopes and whether it takes the scope.
+
+        Services which neither are scoped nor depend on scoped services
+        reuse the plain compiled resolvers.
+        """
+        frozen = self._frozen_scope_resolvers
+        if frozen is not None and key in frozen:
+            return frozen[key]
+
+        self._refresh_caches()
+
+        try:
+            return self._scope_resolvers[key]
+        except KeyError:
+            if self._get_owner(key) is None:
+                return partial(self._get_dynamic, key), False  # not cached
+            resolver = self._scope_resolvers[key] = self._compile_scope(key)
+            return resolver
+
+    def _compile_scope(self, key: Hashable) -> TScopeResolver:
+        owner = self._get_owner(key)
+        if owner is not self:
+            if owner is None:
+                return partial(self._get_dynamic, key), False
+            return owner._get_scope_resolver(key)
+
+        klass = self.get_injectable(key)
+        if self.is_singleton(klass):
+            return self._get_resolver(key), False
+        if klass in self._compiling_scope:  # circular dependency
+            return partial(self._get, klass), False
+
+        self._compiling_scope = self._compiling_scope | {klass}
+        try:
+            target = self.get_injectable(klass)
+            if target in self._context:
+                factory = self._context[target]
+                build, takes_scope = partial(factory, self), False
+            else:
+                arguments = [
+                    self._compile_scope_argument(argument, target)
+                    for argument in self._get_plan(target)
+                ]
+                providers = [provider for provider, _ in arguments]
+                scoped = [takes_scope for _, takes_scope in arguments]
+                takes_scope = any(scoped)
+                build = _make_constructor(
+                    target, providers, scoped if takes_scope else None
+                )
+        finally:
+            self._compiling_scope = self._compiling_scope - {klass}
+
+        if self.is_scoped(klass):
+            if not takes_scope:
+                build = partial(_call_ignoring_scope, build)
+            scope_key = (self, klass)
+            return partial(_get_scoped, scope_key, build), True
+        if not takes_scope:
+            return self._get_resolver(key), False
+        return build, True
+
+    def _compile_scope_argument(
+        self,
+        argument: Argument,
+        key: Type,
+    ) -> TScopeResolver:
+        source, container, value = self._get_source(argument)
+
+        if source is Source.INJECTABLE:
+            resolver, takes_scope = container._get_scope_resolver(value)
+            if argument.lazy and takes_scope:
+                return partial(_lazy_in_scope, resolver), True
+            if argument.provider and takes_scope:
+                return partial(partial, resolver), True
+            if argument.deferred:
+                return self._compile_argument(argument, key), False
+            return resolver, takes_scope
+
+        return self._compile_argument(argument, key), False
+
+    def _get_call_resolvers(
+        self,
+        plan: calls.CallPlan,
+        scoped: bool,
+    ) -> Tuple[TCallResolver, ...]:
+        """Resolvers of injected arguments of a function call, within a
+        scope when `scoped`."""
+        if overrides.current() is not None:
+            return self._compile_call(plan, scoped, dynamic=True)
+
+        self._refresh_caches()
+
+        try:
+            return self._call_resolvers[plan, scoped]
+        except KeyError:
+            resolvers = self._call_resolvers[plan, scoped] = (
+                self._compile_call(plan, scoped)
+            )
+            return resolvers
+
+    def _compile_call(
+        self,
+        plan: calls.CallPlan,
+        scoped: bool,
+        dynamic: bool = False,
+    ) -> Tuple[TCallResolver, ...]:
+        resolvers = []
+        for name, position, argument, default in plan.arguments:
+            if default is not calls.EMPTY and not self._is_provided(argument):
+                continue  # keep the default value
+
+            if dynamic:
+                # scoped services come from the scope, anything else
+                # through the dynamic path which sees the overrides
+                resolver, takes_scope = None, False
+                if scoped:
+                    resolver, takes_scope = self._compile_scope_argument(
+                        argument, plan.function
+                    )
+                if not takes_scope:
+                    resolver = partial(
+                        self._get_argument, argument, plan.function
+                    )
+            elif scoped:
+                resolver, takes_scope = self._compile_scope_argument(
+                    argument, plan.function
+                )
+            else:
+                resolver = self._compile_argument(argument, plan.function)
+                takes_scope = False
+            resolvers.append((name, position, resolver, takes_scope))
+        return tuple(resolvers)
+
+
+def _get_scoped(key: Hashable, build: Callable[[Scope], Any], scope: Scope):
+    return scope._get_scoped(key, build)
+
+
+def _call_ignoring_scope(build: TResolver, scope: Scope):
+    return build()
+
+
+def _lazy_in_scope(build: Callable[[Scope], Any], scope: Scope) -> Lazy:
+    return Lazy(partial(build, scope))
+
+
+# Containers with fork policies other than SHARE.
+_fork_aware: 'weakref.WeakSet[Container]' = weakref.WeakSet()
+# Containers which allocated their locks.
+_locking: 'weakref.WeakSet[Container]' = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    global _allocation_lock
+    _allocation_lock = threading.Lock()
+
+    for container in set(_fork_aware) | set(_locking):
+        container._after_fork_in_child()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
 
-        return param.annotation,
+def _warm_up_node(node: TNode) -> float:
+    container, klass = node
+    started = time.perf_counter()
+    container._get(klass)
+    return time.perf_counter() - started
 
 
 injectable = Container()
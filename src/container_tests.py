@@ -1,10 +1,18 @@
+import asyncio
+import logging
+import os
+import threading
+import time
 import pytest
 
+from collections import Counter
 from typing import Optional, Union, Dict, Hashable
 from unittest.mock import Mock
 
-from . import exceptions
+from . import container as container_module, exceptions
 from .container import Container, injectable
+from .injector import ForkPolicy
+from .provider import Provider
 
 
 @pytest.mark.parametrize('context', [
@@ -551,3 +559,913 @@ def test_example_multitenant_report_builder():
     assert builder_c.log.context == {
         'scope': 'global'
     }
+
+
+def test_compiled_container_should_resolve_same_graph():
+    container = Container()
+
+    @container(singleton=False)
+    class A:
+        pass
+
+    @container()
+    class B:
+        def __init__(self, a: A, value: Optional[int]):
+            self.a = a
+            self.value = value
+
+    @container(key='c', singleton=False)
+    class C:
+        def __init__(self, a: A, b: B):
+            self.a = a
+            self.b = b
+
+    container.compile()
+    c = container.get('c')
+
+    assert 'c' in container._resolvers
+    assert isinstance(c, C)
+    assert c.b is container.get(B)
+    assert c.b.value is None
+    assert c.a is not c.b.a
+    assert container.get(C) is not c
+
+
+def test_compiled_container_should_share_singletons_with_dynamic_path():
+    container = Container()
+
+    @container(key='a')
+    class A:
+        pass
+
+    instance = container.get(A)
+    container.compile()
+
+    assert container.get(A) is instance
+    assert container.get('a') is instance
+
+
+def test_compiled_container_should_rebuild_resolvers_on_register():
+    container = Container()
+
+    class A:
+        pass
+
+    class B:
+        pass
+
+    container.register('service', A, False)
+    container.compile()
+    assert isinstance(container.get('service'), A)
+
+    container.register('service', B, False)
+    assert isinstance(container.get('service'), B)
+
+
+def test_compiled_container_should_rebuild_resolvers_on_context_change():
+    container = Container()
+
+    class A:
+        def __init__(self, value: int):
+            self.value = value
+
+    container.register(A, A, False)
+    container.context[int] = 1
+    container.compile()
+    assert container.get(A).value == 1
+
+    container.context[int] = 2
+    assert container.get(A).value == 2
+
+    container.context = {int: lambda inj: 3}
+    assert container.get(A).value == 3
+
+
+def test_compiled_container_should_rebuild_resolvers_on_parent_change():
+    root = Container()
+    child = Container(parent=root)
+
+    class A:
+        pass
+
+    class B:
+        def __init__(self, a: A):
+            self.a = a
+
+    child.register(B, B, False)
+    child.compile()
+
+    with pytest.raises(exceptions.NonInjectableArgument):
+        child.get(B)
+
+    root.register(A, A, True)
+
+    assert child.get(B).a is root.get(A)
+
+
+def test_child_changes_should_keep_caches_of_parent_and_siblings():
+    root = Container()
+    child = Container(parent=root)
+    sibling = Container(parent=root)
+
+    @root()
+    class A:
+        pass
+
+    root.compile()
+    sibling.compile()
+    assert sibling.get(A) is root.get(A)
+    resolvers = root._resolvers, sibling._resolvers
+
+    child.register('a', A, True)
+    child.context[int] = 1
+    child.close()
+
+    assert sibling.get(A) is root.get(A)
+    assert root._resolvers is resolvers[0]
+    assert sibling._resolvers is resolvers[1]
+
+
+@pytest.mark.parametrize('compiled', [False, True])
+def test_should_not_cache_missing_keys(compiled):
+    root = Container()
+    child = Container(parent=root)
+    if compiled:
+        child.compile()
+
+    for index in range(10):
+        with pytest.raises(exceptions.NonInjectableClass):
+            child.get(f'missing_{index}')
+        with pytest.raises(exceptions.NonInjectableClass):
+            child.scope().get(f'missing_{index}')
+
+    assert not child._owners
+    assert not child._resolvers
+    assert not child._scope_resolvers
+
+
+def test_creating_child_should_keep_compiled_resolvers_of_parent():
+    root = Container()
+
+    @root()
+    class A:
+        pass
+
+    root.compile()
+    resolvers = root._resolvers
+
+    Container(parent=root)
+    Container(parent=root, context={int: 1})
+
+    assert root.get(A) is root.get(A)
+    assert root._resolvers is resolvers
+
+
+def test_compiled_container_should_fall_back_on_circular_dependency():
+    container = Container()
+
+    class A:
+        def __init__(self, b: 'B'):
+            pass
+
+    class B:
+        def __init__(self, a: A):
+            pass
+
+    A.__init__.__annotations__['b'] = B
+    container.register(A, A, False)
+    container.register(B, B, False)
+    container.compile()
+
+    with pytest.raises(RecursionError):
+        container.get(A)
+
+
+def test_compiled_container_should_raise_for_non_registered_service():
+    class A:
+        pass
+
+    container = Container()
+    container.compile()
+
+    with pytest.raises(exceptions.NonInjectableClass):
+        container.get(A)
+
+
+def test_should_not_log_resolution_without_trace(caplog):
+    container = Container()
+
+    class A:
+        pass
+
+    class B:
+        def __init__(self, a: A):
+            self.a = a
+
+    container.register(A, A, True)
+    container.register(B, B, False)
+
+    with caplog.at_level(logging.DEBUG):
+        container.get(B)
+
+    assert caplog.records == []
+
+
+def test_should_log_resolution_with_trace(caplog):
+    container = Container(trace=True)
+
+    class A:
+        pass
+
+    container.register(A, A, True)
+
+    with caplog.at_level(logging.DEBUG):
+        container.get(A)
+
+    assert 'instantiate klass=' in caplog.text
+
+
+@pytest.mark.parametrize('compiled', [False, True])
+def test_should_build_singletons_once_under_concurrent_access(compiled):
+    container = Container()
+    constructed = Counter()
+    threads_count = 32
+
+    def slow_init(self, *args):
+        constructed[type(self)] += 1
+        time.sleep(0.01)
+
+    @container()
+    class Pool:
+        __init__ = slow_init
+
+    @container()
+    class Reader:
+        def __init__(self, pool: Pool):
+            slow_init(self)
+
+    @container()
+    class Writer:
+        def __init__(self, pool: Pool):
+            slow_init(self)
+
+    @container(singleton=False)
+    class Handler:
+        def __init__(self, reader: Reader, writer: Writer):
+            self.reader = reader
+            self.writer = writer
+
+    if compiled:
+        container.compile()
+
+    barrier = threading.Barrier(threads_count)
+    handlers = []
+
+    def worker():
+        barrier.wait()
+        handlers.append(container.get(
+            (Handler, Reader, Writer)[len(handlers) % 3]
+        ))
+
+    threads = [threading.Thread(target=worker) for _ in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert len(handlers) == threads_count
+    assert constructed == {Pool: 1, Reader: 1, Writer: 1}
+    assert container._locks == {}
+
+
+def test_should_get_service_with_async_factories():
+    container = Container()
+
+    class Pool:
+        pass
+
+    class Cache:
+        def __init__(self):
+            self.warm = False
+
+        async def __ainit__(self):
+            self.warm = True
+
+    class Service:
+        def __init__(self, pool: Pool, cache: Cache, value: int):
+            self.pool = pool
+            self.cache = cache
+            self.value = value
+
+    async def make_pool(injector):
+        return Pool()
+
+    async def make_value(injector):
+        return 42
+
+    container.register(Pool, Pool, True)
+    container.register(Cache, Cache, True)
+    container.register(Service, Service, False)
+    container.context[Pool] = make_pool
+    container.context[int] = make_value
+
+    service = asyncio.run(container.aget(Service))
+
+    assert isinstance(service.pool, Pool)
+    assert service.cache.warm is True
+    assert service.value == 42
+
+
+def test_should_resolve_independent_async_dependencies_concurrently():
+    container = Container()
+
+    class A:
+        pass
+
+    class B:
+        pass
+
+    class Service:
+        def __init__(self, a: A, b: B):
+            self.a = a
+            self.b = b
+
+    async def main():
+        a_started = asyncio.Event()
+
+        async def make_a(injector):
+            a_started.set()
+            return A()
+
+        async def make_b(injector):
+            await a_started.wait()
+            return B()
+
+        container.register(A, A, False)
+        container.register(B, B, False)
+        container.register(Service, Service, False)
+        container.context[B] = make_b
+        container.context[A] = make_a
+
+        return await asyncio.wait_for(container.aget(Service), timeout=1)
+
+    service = asyncio.run(main())
+
+    assert isinstance(service.a, A)
+    assert isinstance(service.b, B)
+
+
+def test_should_share_async_singleton_construction():
+    container = Container()
+    constructed = Counter()
+
+    class Pool:
+        def __init__(self):
+            constructed[Pool] += 1
+
+        async def __ainit__(self):
+            await asyncio.sleep(0.01)
+
+    class Service:
+        def __init__(self, pool: Pool):
+            self.pool = pool
+
+    container.register(Pool, Pool, True)
+    container.register(Service, Service, False)
+
+    async def main():
+        return await asyncio.gather(*[
+            container.aget(Service) for _ in range(10)
+        ])
+
+    services = asyncio.run(main())
+
+    assert constructed[Pool] == 1
+    assert all(service.pool is services[0].pool for service in services)
+    assert container._futures == {}
+
+
+def test_should_aget_service_from_parent_container():
+    root = Container()
+    child = Container(parent=root)
+
+    class A:
+        pass
+
+    class B:
+        def __init__(self, a: A):
+            self.a = a
+
+    root.register(A, A, True)
+    child.register(B, B, True)
+
+    b = asyncio.run(child.aget(B))
+
+    assert b.a is root.get(A)
+    assert asyncio.run(child.aget(A)) is root.get(A)
+
+
+def test_should_raise_on_async_circular_dependency():
+    container = Container()
+
+    class A:
+        def __init__(self, b: 'B'):
+            pass
+
+    class B:
+        def __init__(self, a: A):
+            pass
+
+    A.__init__.__annotations__['b'] = B
+    container.register(A, A, True)
+    container.register(B, B, True)
+
+    with pytest.raises(RecursionError):
+        asyncio.run(container.aget(A))
+
+
+def test_should_raise_on_async_non_registered_service():
+    class A:
+        pass
+
+    with pytest.raises(exceptions.NonInjectableClass):
+        asyncio.run(Container().aget(A))
+
+
+def _make_warm_up_graph(container: Container):
+    built = []
+
+    class Pool:
+        def __init__(self):
+            built.append(Pool)
+
+    class Cache:
+        def __init__(self):
+            built.append(Cache)
+
+    class Repository:
+        def __init__(self, pool: Pool):
+            built.append(Repository)
+
+    class Factory:
+        def __init__(self, pool: Pool):
+            built.append(Factory)
+
+    class Service:
+        def __init__(
+            self, repository: Repository, factory: Factory, cache: Cache
+        ):
+            built.append(Service)
+
+    container.register(Pool, Pool, True)
+    container.register(Cache, Cache, True)
+    container.register(Repository, Repository, True)
+    container.register(Factory, Factory, False)
+    container.register(Service, Service, True)
+
+    return built, (Pool, Cache, Repository, Service)
+
+
+def test_warm_up_should_build_every_singleton_in_dependency_order():
+    root = Container()
+    child = Container(parent=root)
+    built, (pool, cache, repository, service) = _make_warm_up_graph(root)
+
+    class Handler:
+        def __init__(self, service: service):
+            self.service = service
+
+    child.register(Handler, Handler, True)
+
+    timings = child.warm_up(max_workers=4)
+
+    assert set(timings) == {pool, cache, repository, service, Handler}
+    assert all(seconds >= 0 for seconds in timings.values())
+    assert built.count(pool) == 1
+    assert built.index(pool) < built.index(repository)
+    assert built.index(repository) < built.index(service)
+    assert child.get(Handler).service is root.get(service)
+
+
+def test_warm_up_should_build_independent_singletons_in_parallel():
+    container = Container()
+    delay = 0.05
+
+    for index in range(8):
+        klass = type(f'Slow{index}', (), {
+            '__init__': lambda self: time.sleep(delay),
+        })
+        container.register(klass, klass, True)
+
+    started = time.perf_counter()
+    timings = container.warm_up(max_workers=8)
+
+    assert len(timings) == 8
+    assert time.perf_counter() - started < delay * 4
+
+
+def test_awarm_up_should_build_every_singleton():
+    container = Container()
+    built, (pool, cache, repository, service) = _make_warm_up_graph(container)
+
+    timings = asyncio.run(container.awarm_up())
+
+    assert set(timings) == {pool, cache, repository, service}
+    assert built.count(pool) == 1
+    assert built.index(repository) < built.index(service)
+
+
+def test_should_index_owner_of_key_in_parent_chain():
+    root = Container()
+    middle = Container(parent=root)
+    child = Container(parent=middle)
+
+    class A:
+        pass
+
+    root.register(A, A, True)
+
+    assert child.get(A) is root.get(A)
+    assert child._get_owner(A) is root
+    assert middle._get_owner(A) is root
+
+
+def test_should_invalidate_owner_index_on_register_and_reset():
+    root = Container()
+    child = Container(parent=root)
+
+    class A:
+        pass
+
+    root.register(A, A, True)
+    from_root = child.get(A)
+
+    child.register(A, A, True)
+    from_child = child.get(A)
+
+    assert from_child is not from_root
+    assert child._get_owner(A) is child
+
+    child.reset()
+    root.reset()
+
+    with pytest.raises(exceptions.NonInjectableClass):
+        child.get(A)
+
+
+def test_should_invalidate_argument_sources_on_parent_context_change():
+    root = Container({int: 1})
+    child = Container(parent=root)
+
+    class A:
+        def __init__(self, value: int):
+            self.value = value
+
+    child.register(A, A, False)
+    assert child.get(A).value == 1
+
+    root.context[int] = 2
+    assert child.get(A).value == 2
+
+    child.context[int] = lambda injector: 3
+    assert child.get(A).value == 3
+
+
+def _make_closeable_graph(container: Container, log: list):
+    class Pool:
+        def close(self):
+            log.append(Pool)
+
+    class Cache:
+        async def aclose(self):
+            await asyncio.sleep(0)
+            log.append(Cache)
+
+    class Repository:
+        def __init__(self, pool: Pool, cache: Cache):
+            self.pool = pool
+
+        def __exit__(self, *exc_info):
+            log.append(Repository)
+
+    container.register(Pool, Pool, True)
+    container.register(Cache, Cache, True)
+    container.register(Repository, Repository, True)
+
+    return Pool, Cache, Repository
+
+
+def test_should_close_singletons_in_reverse_construction_order():
+    container = Container()
+    log = []
+    pool, cache, repository = _make_closeable_graph(container, log)
+    container.compile()
+
+    instance = container.get(repository)
+    container.close()
+
+    assert log == [repository, pool]
+    assert container._instances == {}
+    assert container.get(repository) is not instance
+
+
+def test_should_aclose_singletons_after_their_dependents():
+    container = Container()
+    log = []
+    pool, cache, repository = _make_closeable_graph(container, log)
+
+    container.get(repository)
+    asyncio.run(container.aclose())
+
+    assert sorted(log, key=lambda klass: klass.__name__) == [
+        cache, pool, repository
+    ]
+    assert log[0] is repository
+
+
+def test_should_close_only_own_singletons():
+    root = Container()
+    child = Container(parent=root)
+    log = []
+    pool, cache, repository = _make_closeable_graph(root, log)
+
+    class Service:
+        def __init__(self, pool: pool):
+            pass
+
+        def close(self):
+            log.append(Service)
+
+    child.register(Service, Service, True)
+    child.get(Service)
+    child.close()
+
+    assert log == [Service]
+
+
+def _make_frozen_graph():
+    root = Container({int: 1})
+
+    class A:
+        pass
+
+    class B:
+        def __init__(self, a: A, value: int):
+            self.a = a
+            self.value = value
+
+    root.register(A, A, True)
+    root.register('b', B, False)
+    root.freeze()
+
+    return root, A, B
+
+
+def test_frozen_container_should_resolve_from_precomputed_tables():
+    root, A, B = _make_frozen_graph()
+
+    b = root.get('b')
+
+    assert root.frozen is True
+    assert b.a is root.get(A)
+    assert b.value == 1
+    assert set(root._frozen_resolvers) == {A, 'b', B}
+    assert root._plans.keys() == {B, A}
+
+
+@pytest.mark.parametrize('change', [
+    lambda container: container.register('c', object, True),
+    lambda container: container.reset(),
+    lambda container: setattr(container, 'context', {}),
+])
+def test_frozen_container_should_reject_changes(change):
+    root, A, B = _make_frozen_graph()
+
+    with pytest.raises(exceptions.FrozenContainer):
+        change(root)
+
+    with pytest.raises(TypeError):
+        root.context[int] = 2
+
+
+def test_frozen_container_should_share_tables_with_children():
+    root, A, B = _make_frozen_graph()
+    child = Container(parent=root)
+
+    class C:
+        def __init__(self, b: B):
+            self.b = b
+
+    child.register(C, C, True)
+    c = child.get(C)
+
+    assert c.b.a is root.get(A)
+    assert child._get_resolver(A) is root._frozen_resolvers[A]
+
+    child.freeze()
+
+    assert child.get(C) is c
+    assert child._frozen_resolvers[A] is root._frozen_resolvers[A]
+
+
+def test_frozen_container_should_rebuild_singletons_after_close():
+    root, A, B = _make_frozen_graph()
+    child = Container(parent=root)
+    child.freeze()
+
+    a = child.get(A)
+    root.close()
+
+    assert child.get(A) is not a
+    assert child.get(A) is root.get(A)
+
+
+def test_should_freeze_parents_first():
+    root = Container()
+    child = Container(parent=root)
+
+    with pytest.raises(exceptions.InjectionError):
+        child.freeze()
+
+
+def _run_in_fork(function):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # child
+        os.close(read_fd)
+        try:
+            result = repr(function())
+        except Exception as error:
+            result = type(error).__name__
+        os.write(write_fd, result.encode())
+        os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        result = pipe.read()
+    os.waitpid(pid, 0)
+    return result
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires fork')
+@pytest.mark.parametrize('compiled', [False, True])
+def test_should_apply_fork_policies_in_child_process(compiled):
+    container = Container()
+
+    @container()
+    class Shared:
+        pass
+
+    @container(fork_policy='rebuild_in_child')
+    class Pool:
+        pass
+
+    @container(fork_policy=ForkPolicy.FORBID)
+    class Socket:
+        pass
+
+    @container(fork_policy=ForkPolicy.FORBID)
+    class Lazy:
+        pass
+
+    @container()
+    class Handler:
+        def __init__(self, pools: Provider[Pool]):
+            self.pools = pools
+
+    if compiled:
+        container.compile()
+
+    shared, pool = container.get(Shared), container.get(Pool)
+    container.get(Socket)
+    assert container.get(Handler).pools() is pool
+
+    assert _run_in_fork(lambda: container.get(Shared) is shared) == 'True'
+    assert _run_in_fork(lambda: container.get(Pool) is pool) == 'False'
+    assert _run_in_fork(
+        lambda: container.get(Handler).pools() is pool
+    ) == 'False'
+    assert _run_in_fork(
+        lambda: container.get(Pool) is container.get(Pool)
+    ) == 'True'
+    assert _run_in_fork(lambda: container.get(Socket)) == 'ForkError'
+    assert _run_in_fork(
+        lambda: asyncio.run(container.aget(Socket))
+    ) == 'ForkError'
+    assert _run_in_fork(
+        lambda: isinstance(container.get(Lazy), Lazy)
+    ) == 'True'
+    assert container.get(Pool) is pool
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires fork')
+def test_should_replace_locks_held_at_fork():
+    container = Container()
+
+    @container()
+    class A:
+        pass
+
+    container.get(A)
+    lock = container._get_container_lock()
+
+    with lock, container_module._allocation_lock:
+        assert _run_in_fork(
+            lambda: container._get_container_lock().acquire(timeout=1)
+            and Container()._get_container_lock().acquire(timeout=1)
+        ) == 'True'
+
+
+@pytest.mark.parametrize('compiled', [False, True])
+@pytest.mark.parametrize('memoize', [False, True])
+def test_get_many_should_resolve_keys_in_order(compiled, memoize):
+    root = Container()
+
+    @root()
+    class Config:
+        pass
+
+    container = Container(parent=root)
+
+    @container(singleton=False)
+    class Session:
+        def __init__(self, config: Config):
+            self.config = config
+
+    @container('repository', singleton=False)
+    class Repository:
+        def __init__(self, session: Session):
+            self.session = session
+
+    if compiled:
+        container.compile()
+
+    session, repository, config, other = container.get_many(
+        [Session, 'repository', Config, 'repository'], memoize=memoize
+    )
+
+    assert config is root.get(Config) is session.config
+    assert isinstance(repository, Repository)
+    assert (repository.session is session) is memoize
+    assert (repository is other) is memoize
+
+    resolved = container.get_dict(['repository', Session], memoize=memoize)
+    assert list(resolved) == ['repository', Session]
+    assert (resolved['repository'].session is resolved[Session]) is memoize
+
+
+def test_get_many_should_raise_for_non_registered_service():
+    container = Container()
+
+    with pytest.raises(exceptions.NonInjectableClass):
+        container.get_many(['missing'])
+    with pytest.raises(exceptions.NonInjectableClass):
+        container.get_many(['missing'], memoize=True)
+
+
+def test_empty_containers_should_share_placeholders():
+    root = Container()
+    first, second = Container(parent=root), Container(parent=root)
+
+    assert not hasattr(first, '__dict__')
+    assert first._owners is second._owners
+    assert first._compiling is second._compiling
+
+    @first()
+    class A:
+        pass
+
+    first.compile()
+
+    assert first._owners is not second._owners
+    assert not second._owners
+    assert not first._compiling
+
+
+def test_empty_containers_should_allocate_storage_on_first_write():
+    root = Container()
+    first, second = Container(parent=root), Container(parent=root)
+
+    for name in (
+        '_registrations', '_instances', '_locks', '_futures', '_plans',
+        '_context',
+    ):
+        assert getattr(first, name) is getattr(second, name)
+    assert first._lock is None
+
+    @first()
+    class A:
+        pass
+
+    first.get(A)
+    first.context[int] = 1
+
+    assert first._registrations is not second._registrations
+    assert first._instances == {A: first.get(A)}
+    assert first._plans.keys() == {A}
+    assert first.context == {int: 1}
+    assert not second._registrations
+    assert not second._instances
+    assert not second._plans
+    assert not second._context
@@ -0,0 +1,84 @@
+import asyncio
+import inspect
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+
+def close_instance(instance: Any):
+    close = getattr(instance, 'close', None)
+    if callable(close):
+        close()
+    elif hasattr(instance, '__exit__'):
+        instance.__exit__(None, None, None)
+
+
+async def aclose_instance(instance: Any):
+    aclose = getattr(instance, 'aclose', None)
+    if callable(aclose):
+        await aclose()
+    elif hasattr(instance, '__aexit__'):
+        await instance.__aexit__(None, None, None)
+    else:
+        close = getattr(instance, 'close', None)
+        if callable(close):
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+        elif hasattr(instance, '__exit__'):
+            instance.__exit__(None, None, None)
+
+
+def close_all(instances: Sequence[Any]):
+    """Close `instances` in reverse construction order.
+
+    Every instance is closed even if some of them fail, the first error
+    is raised afterwards.
+    """
+    errors = []
+    for instance in reversed(instances):
+        try:
+            close_instance(instance)
+        except Exception as error:
+            errors.append(error)
+
+    if errors:
+        raise errors[0]
+
+
+async def aclose_all(
+    instances: Sequence[Any],
+    dependencies: Optional[Dict[int, Set[int]]] = None,
+):
+    """Close `instances` concurrently, each one after its dependents.
+
+    `dependencies` maps an index of `instances`, which are in
+    construction order, to indexes of instances it depends on. Without
+    it instances are closed one by one in reverse construction order.
+    """
+    if dependencies is None:
+        dependencies = {
+            index: {index - 1} for index in range(1, len(instances))
+        }
+
+    dependents: Dict[int, List[int]] = {}
+    for index, depends_on in dependencies.items():
+        for dependency in depends_on:
+            if dependency < index:
+                dependents.setdefault(dependency, []).append(index)
+
+    tasks: Dict[int, asyncio.Future] = {}
+
+    async def close(index: int):
+        await asyncio.gather(
+            *[tasks[dependent] for dependent in dependents.get(index, ())],
+            return_exceptions=True,
+        )
+        await aclose_instance(instances[index])
+
+    for index in reversed(range(len(instances))):
+        tasks[index] = asyncio.ensure_future(close(index))
+
+    for result in await asyncio.gather(
+        *tasks.values(), return_exceptions=True
+    ):
+        if isinstance(result, Exception):
+            raise result
@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+
+from . import disposal
+
+
+class Closeable:
+    def __init__(self, log, name):
+        self.log = log
+        self.name = name
+
+    def close(self):
+        self.log.append(self.name)
+
+
+class AsyncCloseable(Closeable):
+    async def aclose(self):
+        await asyncio.sleep(0)
+        self.log.append(self.name)
+
+
+class ContextManager(Closeable):
+    def __exit__(self, *exc_info):
+        self.log.append(self.name)
+
+
+class Failing:
+    def close(self):
+        raise RuntimeError('close failed')
+
+
+def test_should_close_instances_in_reverse_order():
+    log = []
+
+    disposal.close_all([
+        Closeable(log, 'a'),
+        object(),
+        ContextManager(log, 'b'),
+        Closeable(log, 'c'),
+    ])
+
+    assert log == ['c', 'b', 'a']
+
+
+def test_should_close_every_instance_before_raising():
+    log = []
+
+    with pytest.raises(RuntimeError):
+        disposal.close_all([Closeable(log, 'a'), Failing()])
+
+    assert log == ['a']
+
+
+def test_should_aclose_instances_after_their_dependents():
+    log = []
+    instances = [
+        AsyncCloseable(log, 'pool'),
+        AsyncCloseable(log, 'cache'),
+        Closeable(log, 'repository'),
+        AsyncCloseable(log, 'service'),
+    ]
+
+    asyncio.run(disposal.aclose_all(instances, {
+        2: {0},
+        3: {1, 2},
+    }))
+
+    assert sorted(log) == ['cache', 'pool', 'repository', 'service']
+    assert log.index('service') < log.index('repository')
+    assert log.index('repository') < log.index('pool')
+    assert log.index('service') < log.index('cache')
+
+
+def test_should_aclose_instances_one_by_one_without_dependencies():
+    log = []
+
+    asyncio.run(disposal.aclose_all([
+        AsyncCloseable(log, 'a'),
+        ContextManager(log, 'b'),
+        AsyncCloseable(log, 'c'),
+    ]))
+
+    assert log == ['c', 'b', 'a']
@@ -1,4 +1,4 @@
-from typing import Type
+from typing import Sequence, Type
 
 
 class InjectionError(Exception):
@@ -27,3 +27,47 @@ class NonInjectableArgument(InjectionError):
         self.client = client
         self.argument_name = argument_name
         self.argument_type = argument_type
+
+
+class ScopeError(InjectionError):
+    def __init__(
+        self,
+        msg: str,
+        klass: Type,
+    ):
+        super().__init__(msg)
+        self.klass = klass
+
+
+class CircularDependency(InjectionError):
+    def __init__(
+        self,
+        msg: str,
+        cycle: Sequence[Type],
+    ):
+        super().__init__(msg)
+        self.cycle = cycle
+
+
+class InvalidContainer(InjectionError):
+    def __init__(
+        self,
+        msg: str,
+        errors: Sequence[InjectionError],
+    ):
+        super().__init__(msg)
+        self.errors = errors
+
+
+class FrozenContainer(InjectionError):
+    pass
+
+
+class ForkError(InjectionError):
+    def __init__(
+        self,
+        msg: str,
+        klass: Type,
+    ):
+        super().__init__(msg)
+        self.klass = klass
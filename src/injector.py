@@ -1,24 +1,56 @@
+import enum
 import logging
-from typing import Type, Optional, Dict, Hashable
+import sys
+from types import MappingProxyType
+from typing import Type, Optional, Dict, Hashable, Mapping, NamedTuple, Union
 
 from . import exceptions
 
 
+class ForkPolicy(enum.Enum):
+    """What a forked child process does with a singleton built before
+    the fork."""
+    SHARE = 'share'
+    REBUILD_IN_CHILD = 'rebuild_in_child'
+    FORBID = 'forbid'
+
+
+TForkPolicy = Union[ForkPolicy, str]
+
+logger = logging.getLogger(__name__)
+
+
+class Registration(NamedTuple):
+    """Class and lifetime registered under a key."""
+    klass: Type
+    singleton: bool
+    scoped: bool
+    fork_policy: ForkPolicy
+
+
+# Shared by injectors without registrations, replaced on first write.
+_NO_REGISTRATIONS: Mapping = MappingProxyType({})
+
+
 class Injector:
+    __slots__ = ('_registrations', '__weakref__')
+
     def __init__(self):
-        self._logger = logging.getLogger(__name__)
-        self._injectable: Dict[Hashable, Type] = {}
-        self._singletons: Dict[Hashable, Type] = {}
+        self._registrations: Mapping[Hashable, Registration] = (
+            _NO_REGISTRATIONS
+        )
 
     def __call__(
         self,
         key: Optional[Hashable] = None,
         singleton: bool = True,
+        scoped: bool = False,
+        fork_policy: TForkPolicy = ForkPolicy.SHARE,
     ) -> Type:
         def wrapper(
             klass: Type,
         ):
-            return self.register(key, klass, singleton)
+            return self.register(key, klass, singleton, scoped, fork_policy)
 
         return wrapper
 
@@ -26,20 +58,28 @@ class Injector:
         self,
         key: Hashable,
         klass: Type,
-        singleton: bool
+        singleton: bool,
+        scoped: bool = False,
+        fork_policy: TForkPolicy = ForkPolicy.SHARE,
     ) -> Type:
-        self._logger.debug(
-            'register new class=%s, signleton=%s',
-            klass, singleton
+        # one record shared by the key and the class
+        registration = Registration(
+            klass, bool(singleton and not scoped), bool(scoped),
+            ForkPolicy(fork_policy),
         )
+        if type(key) is str:
+            key = sys.intern(key)
 
-        for inject_key in (key, klass):
-            if not inject_key:
-                continue
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                'register new class=%s, signleton=%s, scoped=%s',
+                klass, singleton, scoped
+            )
 
-            self._injectable[inject_key] = klass
-            if singleton:
-                self._singletons[inject_key] = klass
+        registrations = self._writable_registrations()
+        for inject_key in (key, klass):
+            if inject_key:
+                registrations[inject_key] = registration
 
         return klass
 
@@ -47,23 +87,48 @@ class Injector:
         self,
         key: Hashable
     ) -> bool:
-        return key in self._injectable
+        return key in self._registrations
 
     def is_singleton(
         self, key: Type
     ) -> bool:
-        return key in self._singletons
+        registration = self._registrations.get(key)
+        return registration is not None and registration.singleton
 
-    def get_injectable(
+    def is_scoped(
         self, key: Type
-    ) -> Type:
-        if key not in self._injectable:
+    ) -> bool:
+        registration = self._registrations.get(key)
+        return registration is not None and registration.scoped
+
+    def get_fork_policy(
+        self, key: Type
+    ) -> ForkPolicy:
+        registration = self._registrations.get(key)
+        if registration is None:
+            return ForkPolicy.SHARE
+        return registration.fork_policy
+
+    def get_registration(
+        self, key: Type
+    ) -> Registration:
+        registration = self._registrations.get(key)
+        if registration is None:
             raise exceptions.NonInjectableClass(
                 f'{key} is non injectable or missing',
                 key
             )
-        return self._injectable[key]
+        return registration
+
+    def get_injectable(
+        self, key: Type
+    ) -> Type:
+        return self.get_registration(key).klass
 
     def reset(self):
-        self._injectable = {}
-        self._singletons = {}
+        self._registrations = _NO_REGISTRATIONS
+
+    def _writable_registrations(self) -> Dict[Hashable, Registration]:
+        if self._registrations is _NO_REGISTRATIONS:
+            self._registrations = {}
+        return self._registrations
@@ -1,8 +1,9 @@
 import pytest
+import sys
 
 from typing import Hashable
 
-from .injector import Injector
+from .injector import ForkPolicy, Injector, Registration
 
 
 injectable = Injector()
@@ -88,3 +89,78 @@ def test_injector_register_new_class_with_custom_key_using_register_method(
     assert injectable.is_injectable(Service) is True
     assert injectable.get_injectable(Service) is Service
     assert injectable.is_singleton(Service) is is_singleton
+
+
+@pytest.mark.parametrize('key', [
+    None,
+    'service_name',
+])
+def test_injector_register_scoped_class(f_clean_up_injector, key: Hashable):
+    @injectable(key=key, scoped=True)
+    class Service:
+        ...
+
+    assert injectable.is_scoped(Service) is True
+    assert injectable.is_singleton(Service) is False
+    if key:
+        assert injectable.is_scoped(key) is True
+
+
+def test_injector_should_replace_lifetime_on_register(f_clean_up_injector):
+    class Service:
+        ...
+
+    injectable.register(None, Service, True)
+    injectable.register(None, Service, False, scoped=True)
+
+    assert injectable.is_singleton(Service) is False
+    assert injectable.is_scoped(Service) is True
+
+    injectable.register(None, Service, False)
+
+    assert injectable.is_singleton(Service) is False
+    assert injectable.is_scoped(Service) is False
+
+
+@pytest.mark.parametrize('fork_policy', [
+    ForkPolicy.REBUILD_IN_CHILD,
+    'rebuild_in_child',
+])
+def test_injector_register_fork_policy(
+    f_clean_up_injector, fork_policy
+):
+    @injectable(key='service', fork_policy=fork_policy)
+    class Service:
+        ...
+
+    assert injectable.get_fork_policy(Service) is ForkPolicy.REBUILD_IN_CHILD
+    assert injectable.get_fork_policy('service') is (
+        ForkPolicy.REBUILD_IN_CHILD
+    )
+
+    injectable.register('service', Service, True)
+
+    assert injectable.get_fork_policy('service') is ForkPolicy.SHARE
+
+
+def test_injector_should_reject_unknown_fork_policy(f_clean_up_injector):
+    class Service:
+        ...
+
+    with pytest.raises(ValueError):
+        injectable.register(None, Service, True, fork_policy='unknown')
+
+
+def test_injector_should_share_record_of_key_and_class(f_clean_up_injector):
+    @injectable(key=''.join(['service', '_name']), singleton=False)
+    class Service:
+        ...
+
+    registration = injectable.get_registration(Service)
+
+    assert registration == Registration(
+        Service, False, False, ForkPolicy.SHARE
+    )
+    assert injectable.get_registration('service_name') is registration
+    assert next(iter(injectable._registrations)) is sys.intern('service_name')
+    assert not hasattr(injectable, '__dict__')
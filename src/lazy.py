@@ -0,0 +1,49 @@
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar('T')
+
+_MISSING = object()
+
+
+class Lazy(Generic[T]):
+    """Proxy of a dependency built on first attribute access.
+
+    Annotating a constructor argument with ``Lazy[Service]`` injects a
+    proxy instead of building ``Service`` with its dependencies up front.
+    Use `resolve` to get the proxied instance itself.
+    """
+
+    __slots__ = ('_lazy_build', '_lazy_instance')
+
+    def __init__(self, build: Callable[[], T]):
+        object.__setattr__(self, '_lazy_build', build)
+        object.__setattr__(self, '_lazy_instance', _MISSING)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(resolve(self), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(resolve(self), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(resolve(self), name)
+
+    def __repr__(self) -> str:
+        instance = object.__getattribute__(self, '_lazy_instance')
+        if instance is _MISSING:
+            return '<Lazy unresolved>'
+        return f'<Lazy {instance!r}>'
+
+
+def resolve(proxy: Lazy[T]) -> T:
+    """Instance behind `proxy`, built on the first call."""
+    instance = object.__getattribute__(proxy, '_lazy_instance')
+    if instance is _MISSING:
+        build = object.__getattribute__(proxy, '_lazy_build')
+        instance = build()
+        object.__setattr__(proxy, '_lazy_instance', instance)
+    return instance
+
+
+def is_lazy(annotation: Any) -> bool:
+    return getattr(annotation, '__origin__', None) is Lazy
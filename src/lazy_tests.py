@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+
+from typing import Optional
+
+from . import exceptions
+from .container import Container
+from .lazy import Lazy, resolve
+from .plan import Argument, make_plan
+
+
+class Expensive:
+    built = 0
+
+    def __init__(self):
+        Expensive.built += 1
+        self.value = 42
+
+
+class Handler:
+    def __init__(self, expensive: Lazy[Expensive]):
+        self.expensive = expensive
+
+
+class Session:
+    pass
+
+
+class Repository:
+    def __init__(self, session: Lazy[Session]):
+        self.session = session
+
+
+class Child:
+    def __init__(self, parent: Lazy['Parent']):
+        self.parent = parent
+
+
+class Parent:
+    def __init__(self, child: Child):
+        self.child = child
+
+
+@pytest.fixture()
+def f_container():
+    Expensive.built = 0
+    container = Container()
+    container.register(Expensive, Expensive, True)
+    container.register(Handler, Handler, False)
+    return container
+
+
+def test_should_plan_lazy_arguments():
+    class Service:
+        def __init__(self, a: Lazy[Expensive], b: Lazy[Optional[Session]]):
+            pass
+
+    assert make_plan(Service) == (
+        Argument('a', Lazy[Expensive], (Expensive,), True),
+        Argument(
+            'b', Lazy[Optional[Session]], (Session, type(None)), True
+        ),
+    )
+
+
+@pytest.mark.parametrize('compiled', [False, True])
+def test_should_build_lazy_dependency_on_first_access(f_container, compiled):
+    if compiled:
+        f_container.compile()
+
+    handler = f_container.get(Handler)
+    assert Expensive.built == 0
+    assert repr(handler.expensive) == '<Lazy unresolved>'
+
+    assert handler.expensive.value == 42
+    assert Expensive.built == 1
+    assert resolve(handler.expensive) is f_container.get(Expensive)
+
+
+def test_should_raise_for_missing_lazy_dependency_eagerly():
+    container = Container()
+    container.register(Handler, Handler, False)
+
+    with pytest.raises(exceptions.NonInjectableArgument):
+        container.get(Handler)
+
+
+@pytest.mark.parametrize('compiled', [False, True])
+def test_lazy_dependency_should_break_cycles(compiled):
+    container = Container()
+    container.register(Parent, Parent, False)
+    container.register(Child, Child, False)
+    if compiled:
+        container.compile()
+
+    parent = container.get(Parent)
+
+    assert resolve(parent.child.parent).child is not parent.child
+    assert container.validate().ok
+
+
+def test_should_resolve_lazy_scoped_dependency_in_scope():
+    container = Container()
+    container.register(Session, Session, False, scoped=True)
+    container.register(Repository, Repository, False)
+
+    with container.scope() as scope:
+        repository = scope.get(Repository)
+        assert resolve(repository.session) is scope.get(Session)
+
+
+def test_should_aget_lazy_dependency(f_container):
+    handler = asyncio.run(f_container.aget(Handler))
+
+    assert Expensive.built == 0
+    assert resolve(handler.expensive) is f_container.get(Expensive)
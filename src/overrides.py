@@ -0,0 +1,65 @@
+"""Context overrides applied to whole resolutions.
+
+Overrides form a stack of layers kept in a context variable, so every
+thread and asyncio task sees its own stack and tasks inherit the layers
+active when they are created. Pushing a layer links it to the current
+one and popping restores the previous one, neither copies the layers
+below. Whether a value is used as is or called as a factory is decided
+once per layer, when it's pushed.
+"""
+import contextvars
+import inspect
+from typing import Any, Dict, Hashable, Mapping, Optional, Tuple
+
+from .plan import Source
+
+TOverride = Tuple[Source, Any]
+
+
+class Overrides:
+    __slots__ = ('_sources', '_parent')
+
+    def __init__(
+        self,
+        context: Mapping[Hashable, Any],
+        parent: Optional['Overrides'] = None,
+    ):
+        self._sources: Dict[Hashable, TOverride] = {
+            key: (
+                Source.FACTORY if inspect.isfunction(value) else Source.VALUE,
+                value,
+            )
+            for key, value in context.items()
+        }
+        self._parent = parent
+
+    def find(self, key: Hashable) -> Optional[TOverride]:
+        """Source of `key` in the topmost layer overriding it."""
+        layer = self
+        while layer is not None:
+            source = layer._sources.get(key)
+            if source is not None:
+                return source
+            layer = layer._parent
+        return None
+
+
+_current: 'contextvars.ContextVar[Optional[Overrides]]' = (
+    contextvars.ContextVar('overrides', default=None)
+)
+
+current = _current.get
+
+
+def push(context: Mapping[Hashable, Any]) -> contextvars.Token:
+    return _current.set(Overrides(context, _current.get()))
+
+
+def pop(token: contextvars.Token):
+    _current.reset(token)
+
+
+def isolate() -> contextvars.Token:
+    """Hide overrides from the current context, e.g. while building a
+    singleton, which outlives the resolution it is built in."""
+    return _current.set(None)
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import pytest
+
+from . import overrides
+from .container import Container
+from .plan import Source
+
+
+class Tenant:
+    name = 'default'
+
+
+def make_tenant(name):
+    tenant = Tenant()
+    tenant.name = name
+    return tenant
+
+
+class User:
+    pass
+
+
+class Repository:
+    def __init__(self, tenant: Tenant):
+        self.tenant = tenant
+
+
+class Handler:
+    def __init__(self, repository: Repository, user: User):
+        self.repository = repository
+        self.user = user
+
+
+class Cache:
+    def __init__(self, tenant: Tenant):
+        self.tenant = tenant
+
+
+@pytest.fixture(params=['dynamic', 'compiled', 'frozen'])
+def f_container(request):
+    root = Container()
+    root.register(Tenant, Tenant, True)
+    root.register(User, User, False)
+    root.register(Cache, Cache, True)
+    container = Container(parent=root)
+    container.register(Repository, Repository, False)
+    container.register(Handler, Handler, False)
+
+    if request.param == 'compiled':
+        container.compile()
+    elif request.param == 'frozen':
+        root.freeze()
+        container.freeze()
+    return container
+
+
+def test_layers_should_precompile_sources_and_nest():
+    factory = lambda injector: User()  # noqa: E731
+    token = overrides.push({Tenant: 'first', User: factory})
+    try:
+        token_nested = overrides.push({Tenant: 'second'})
+        layer = overrides.current()
+        assert layer.find(Tenant) == (Source.VALUE, 'second')
+        assert layer.find(User) == (Source.FACTORY, factory)
+        assert layer.find(Repository) is None
+        overrides.pop(token_nested)
+
+        assert overrides.current().find(Tenant) == (Source.VALUE, 'first')
+    finally:
+        overrides.pop(token)
+
+    assert overrides.current() is None
+
+
+def test_get_should_override_whole_resolution(f_container):
+    tenant = make_tenant('acme')
+
+    handler = f_container.get(Handler, {
+        Tenant: tenant,
+        User: lambda injector: ('user', injector),
+    })
+
+    assert handler.repository.tenant is tenant
+    assert handler.user == ('user', f_container)
+    assert f_container.get(Handler).repository.tenant.name == 'default'
+
+
+def test_override_should_replace_registered_services(f_container):
+    repository = Repository(make_tenant('fake'))
+
+    with f_container.override({Repository: repository}):
+        assert f_container.get(Repository) is repository
+        assert f_container.get(Handler).repository is repository
+        assert f_container.get_many([Repository]) == [repository]
+
+    assert f_container.get(Repository) is not repository
+
+
+def test_singletons_should_be_built_without_overrides(f_container):
+    cache = f_container.get(Cache, {Tenant: make_tenant('acme')})
+
+    assert cache.tenant is f_container.get(Tenant)
+
+
+def test_overrides_should_be_local_to_thread(f_container):
+    entered, checked = threading.Event(), threading.Event()
+    seen = []
+
+    def override():
+        with f_container.override({Tenant: make_tenant('acme')}):
+            entered.set()
+            checked.wait(5)
+
+    thread = threading.Thread(target=override)
+    thread.start()
+    entered.wait(5)
+    seen.append(f_container.get(Repository).tenant.name)
+    checked.set()
+    thread.join()
+
+    assert seen == ['default']
+
+
+def test_overrides_should_be_local_to_task(f_container):
+    async def resolve(name):
+        await asyncio.sleep(0)
+        return await f_container.aget(Handler, {Tenant: make_tenant(name)})
+
+    async def main():
+        return await asyncio.gather(*(
+            resolve(name) for name in ('first', 'second', 'third')
+        ))
+
+    handlers = asyncio.run(main())
+
+    assert [
+        handler.repository.tenant.name for handler in handlers
+    ] == ['first', 'second', 'third']
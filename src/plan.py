@@ -0,0 +1,136 @@
+import enum
+import inspect
+import sys
+import types
+import typing
+from typing import (
+    Type, Tuple, NamedTuple, Any, Callable, Dict, Iterable, List, Optional,
+    Union, get_type_hints,
+)
+
+from .lazy import is_lazy
+from .provider import is_provider
+
+
+class Argument(NamedTuple):
+    name: str
+    annotation: Any
+    types: Tuple[Type, ...]
+    lazy: bool = False  # annotated as Lazy[...]
+    provider: bool = False  # annotated as Provider[...]
+
+    @property
+    def deferred(self) -> bool:
+        """Whether the dependency is built after the dependent."""
+        return self.lazy or self.provider
+
+
+TPlan = Tuple[Argument, ...]
+
+
+class Source(enum.Enum):
+    """How a container provides a constructor argument."""
+    VALUE = enum.auto()
+    FACTORY = enum.auto()
+    INJECTABLE = enum.auto()
+    NONE = enum.auto()
+    MISSING = enum.auto()
+
+
+_VAR_KINDS = (
+    inspect.Parameter.VAR_POSITIONAL,
+    inspect.Parameter.VAR_KEYWORD,
+)
+
+# PEP 604 unions, `X | Y`
+_UNION_TYPE = getattr(types, 'UnionType', ())
+
+
+def is_union(annotation: Any) -> bool:
+    return (
+        getattr(annotation, '__origin__', None) is Union
+        or isinstance(annotation, _UNION_TYPE)
+    )
+
+
+def extract_types(annotation: Any) -> Tuple[Type, ...]:
+    if is_union(annotation):
+        return annotation.__args__
+
+    return annotation,
+
+
+def has_forward_refs(annotation: Any) -> bool:
+    if isinstance(annotation, (str, typing.ForwardRef)):
+        return True
+    return any(
+        has_forward_refs(argument)
+        for argument in getattr(annotation, '__args__', None) or ()
+        if argument is not annotation
+    )
+
+
+def resolve_annotation(
+    annotation: Any,
+    globalns: Optional[Dict[str, Any]] = None,
+    localns: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """`annotation` with forward references evaluated in the namespaces,
+    unchanged when some name can't be resolved."""
+    holder = types.SimpleNamespace(__annotations__={'value': annotation})
+    try:
+        return get_type_hints(holder, globalns, localns)['value']
+    except Exception:
+        return annotation
+
+
+def make_argument(name: str, annotation: Any) -> Argument:
+    if hasattr(annotation, '__metadata__'):  # Annotated[T, ...]
+        annotation = annotation.__origin__
+
+    if is_lazy(annotation) or is_provider(annotation):
+        types = extract_types(annotation.__args__[0])
+        return Argument(
+            name, annotation, types, is_lazy(annotation),
+            is_provider(annotation),
+        )
+
+    return Argument(name, annotation, extract_types(annotation))
+
+
+def plan_parameters(
+    function: Callable,
+    parameters: Iterable[inspect.Parameter],
+    localns: Optional[Dict[str, Any]] = None,
+) -> List[Tuple[inspect.Parameter, Argument]]:
+    """Arguments of `parameters` of `function`, except variadic ones.
+
+    String annotations and forward references, e.g. under
+    ``from __future__ import annotations``, are evaluated in the module
+    of `function`, once per plan.
+    """
+    globalns = getattr(function, '__globals__', None)
+    if globalns is None:
+        module = getattr(function, '__module__', None)
+        globalns = vars(sys.modules.get(module, typing))
+
+    planned = []
+    for param in parameters:
+        if param.kind in _VAR_KINDS:
+            continue
+        annotation = param.annotation
+        if has_forward_refs(annotation):
+            annotation = resolve_annotation(annotation, globalns, localns)
+        planned.append((param, make_argument(param.name, annotation)))
+    return planned
+
+
+def make_plan(klass: Type) -> TPlan:
+    """Constructor arguments of `klass`."""
+    parameters = inspect.signature(klass.__init__).parameters
+    planned = plan_parameters(
+        klass.__init__,
+        list(parameters.values())[1:],
+        {klass.__name__: klass},
+    )
+    return tuple(argument for _, argument in planned)
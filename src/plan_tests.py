@@ -0,0 +1,132 @@
+import sys
+import pytest
+
+from typing import List, Optional, Union
+
+from .container import Container
+from .plan import Argument, make_plan
+
+
+class A:
+    pass
+
+
+class B:
+    pass
+
+
+def test_should_skip_self_and_var_kind_parameters():
+    class Service:
+        def __init__(self, a: A, *args, b: B, **kwargs):
+            pass
+
+    assert make_plan(Service) == (
+        Argument('a', A, (A,)),
+        Argument('b', B, (B,)),
+    )
+
+
+def test_should_build_empty_plan_for_class_without_init():
+    class Service:
+        pass
+
+    assert make_plan(Service) == ()
+
+
+def test_should_extract_union_types():
+    class Service:
+        def __init__(self, a: Union[A, B], b: Optional[B]):
+            pass
+
+    plan = make_plan(Service)
+
+    assert plan[0].types == (A, B)
+    assert plan[1].types == (B, type(None))
+
+
+def test_should_resolve_forward_references():
+    class Service:
+        def __init__(self, a: 'A', b: Optional['B'], c: 'Service',
+                     d: 'Missing'):  # noqa: F821
+            pass
+
+    plan = make_plan(Service)
+
+    assert plan[0].types == (A,)
+    assert plan[1].types == (B, type(None))
+    assert plan[2].types == (Service,)
+    assert plan[3].types == ('Missing',)
+
+
+def test_should_not_unpack_generic_annotations():
+    class Service:
+        def __init__(self, items: List[A]):
+            pass
+
+    assert make_plan(Service)[0].types == (List[A],)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 9), reason='requires Annotated')
+def test_should_strip_annotated_metadata():
+    from typing import Annotated
+
+    class Service:
+        def __init__(self, a: Annotated[A, 'meta'], b: Annotated['B', 1]):
+            pass
+
+    assert [argument.types for argument in make_plan(Service)] == [
+        (A,), (B,),
+    ]
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason='requires PEP 604')
+def test_should_extract_pep_604_union_types():
+    class Service:
+        def __init__(self, a: 'A | B', b: 'B | None'):
+            pass
+
+    plan = make_plan(Service)
+
+    assert plan[0].types == (A, B)
+    assert plan[1].types == (B, type(None))
+
+
+def test_container_should_resolve_string_annotations():
+    class Service:
+        def __init__(self, a: 'A'):
+            self.a = a
+
+    container = Container()
+    container.register(A, A, True)
+    container.register(Service, Service, False)
+
+    assert container.get(Service).a is container.get(A)
+
+
+def test_container_should_cache_plan():
+    container = Container()
+    container.register(A, A, False)
+
+    container.get(A)
+
+    assert container._get_plan(A) is container._get_plan(A)
+
+
+def test_container_should_drop_plan_on_reset():
+    container = Container()
+    container.register(A, A, False)
+    container.get(A)
+
+    container.reset()
+
+    assert container._plans == {}
+
+
+def test_container_should_drop_plan_on_register():
+    container = Container()
+    container.register(A, A, False)
+    container.get(A)
+
+    container.register(A, A, True)
+
+    assert A not in container._plans
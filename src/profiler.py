@@ -0,0 +1,145 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import (
+    Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple,
+)
+
+
+class KeyStats:
+    __slots__ = (
+        'resolutions', 'hits', 'total_time', 'self_time',
+        'max_total_time', 'max_self_time', 'depth',
+    )
+
+    def __init__(self):
+        self.resolutions = 0
+        self.hits = 0
+        self.total_time = 0.0
+        self.self_time = 0.0
+        self.max_total_time = 0.0
+        self.max_self_time = 0.0
+        self.depth = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def key_name(key: Hashable) -> str:
+    if isinstance(key, type):
+        return f'{key.__module__}.{key.__qualname__}'
+    return repr(key)
+
+
+class Profiler:
+    """Resolution statistics of a container.
+
+    Records per key the number of resolutions, singleton cache hits,
+    cumulative and max construction time including dependencies and of
+    the constructor itself, and the deepest parent chain traversed.
+    Construction times are also aggregated per dependency stack for
+    flame graphs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats: Dict[Hashable, KeyStats] = {}
+        self.stacks: Dict[Tuple[str, ...], float] = {}
+
+    def _get_stats(self, key: Hashable) -> KeyStats:
+        try:
+            return self.stats[key]
+        except KeyError:
+            return self.stats.setdefault(key, KeyStats())
+
+    def record_resolution(self, key: Hashable, hit: bool):
+        with self._lock:
+            stats = self._get_stats(key)
+            stats.resolutions += 1
+            stats.hits += hit
+
+    def record_depth(self, key: Hashable, depth: int):
+        with self._lock:
+            stats = self._get_stats(key)
+            stats.depth = max(stats.depth, depth)
+
+    def instantiate(self, key: Hashable, construct: Callable[[Hashable], Any]):
+        """Call `construct(key)` measuring its time."""
+        stack: List[List[Any]] = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        frame = [key, 0.0]  # key and time spent in nested constructions
+        stack.append(frame)
+        started = time.perf_counter()
+        try:
+            return construct(key)
+        finally:
+            total_time = time.perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1][1] += total_time
+            self._record_time(
+                key, total_time, total_time - frame[1],
+                tuple(key_name(parent) for parent, _ in stack)
+                + (key_name(key),),
+            )
+
+    def _record_time(
+        self,
+        key: Hashable,
+        total_time: float,
+        self_time: float,
+        path: Tuple[str, ...],
+    ):
+        with self._lock:
+            stats = self._get_stats(key)
+            stats.total_time += total_time
+            stats.self_time += self_time
+            stats.max_total_time = max(stats.max_total_time, total_time)
+            stats.max_self_time = max(stats.max_self_time, self_time)
+            self.stacks[path] = self.stacks.get(path, 0.0) + self_time
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                key_name(key): stats.as_dict()
+                for key, stats in self.stats.items()
+            }
+
+    def folded(self) -> str:
+        """Folded stacks with self time in microseconds per line, the
+        input format of flamegraph.pl and speedscope.
+        """
+        with self._lock:
+            return ''.join(
+                f'{";".join(path)} {round(self_time * 1e6)}\n'
+                for path, self_time in self.stacks.items()
+            )
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+            self.stacks = {}
+
+
+# Profiler of the resolution running in the current thread or asyncio
+# task, set by the profiled container for parents it resolves from.
+_active: 'contextvars.ContextVar[Optional[Profiler]]' = (
+    contextvars.ContextVar('profiler', default=None)
+)
+
+active_profiler = _active.get
+
+
+@contextmanager
+def profiling(profiler: Profiler) -> Iterator[Profiler]:
+    """Record resolutions of every container into `profiler` within the
+    block."""
+    token = _active.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active.reset(token)
@@ -0,0 +1,127 @@
+import time
+
+from .container import Container
+from .profiler import Profiler, key_name
+
+
+class Pool:
+    def __init__(self):
+        time.sleep(0.002)
+
+
+class Repository:
+    def __init__(self, pool: Pool):
+        time.sleep(0.001)
+
+
+class Service:
+    def __init__(self, repository: Repository, pool: Pool):
+        pass
+
+
+def make_containers():
+    root = Container()
+    root.register(Pool, Pool, True)
+    root.register(Repository, Repository, False)
+
+    child = Container(parent=root)
+    child.register(Service, Service, False)
+
+    return root, child
+
+
+def test_should_record_resolutions_and_hits():
+    root, child = make_containers()
+    profiler = child.profile()
+
+    child.get(Service)
+    child.get(Service)
+
+    stats = profiler.as_dict()
+    assert stats[key_name(Service)]['resolutions'] == 2
+    assert stats[key_name(Service)]['hits'] == 0
+    assert stats[key_name(Pool)]['resolutions'] == 4
+    assert stats[key_name(Pool)]['hits'] == 3
+    assert stats[key_name(Repository)]['resolutions'] == 2
+
+
+def test_should_record_self_and_total_construction_time():
+    root, child = make_containers()
+    profiler = child.profile()
+
+    child.get(Service)
+
+    stats = profiler.stats
+    assert stats[Pool].self_time >= 0.002
+    assert stats[Repository].total_time >= stats[Pool].total_time
+    assert stats[Repository].self_time < stats[Repository].total_time
+    assert stats[Service].total_time >= stats[Repository].total_time
+    assert stats[Service].self_time < 0.001
+    assert stats[Service].max_total_time == stats[Service].total_time
+
+
+def test_should_record_parent_chain_depth():
+    root, child = make_containers()
+    grandchild = Container(parent=child)
+    profiler = grandchild.profile()
+
+    grandchild.get(Service)
+
+    assert profiler.stats[Service].depth == 1
+    assert profiler.stats[Repository].depth == 1
+    assert profiler.stats[Pool].depth == 1
+
+    grandchild.get(Pool)
+
+    assert profiler.stats[Pool].depth == 2
+
+
+def test_should_export_folded_stacks():
+    root, child = make_containers()
+    profiler = child.profile()
+
+    child.get(Service)
+
+    lines = profiler.folded().splitlines()
+    stacks = [line.rsplit(' ', 1)[0] for line in lines]
+
+    assert stacks == [
+        ';'.join(map(key_name, [Service, Repository, Pool])),
+        ';'.join(map(key_name, [Service, Repository])),
+        key_name(Service),
+    ]
+    assert all(int(line.rsplit(' ', 1)[1]) >= 0 for line in lines)
+
+
+def test_should_bypass_compiled_resolvers_while_profiling():
+    root, child = make_containers()
+    child.compile()
+    profiler = child.profile(Profiler())
+
+    child.get(Service)
+
+    assert profiler.stats[Service].resolutions == 1
+
+    profiler.reset()
+    assert profiler.as_dict() == {}
+
+
+def test_should_not_profile_parents_and_siblings():
+    root, child = make_containers()
+    sibling = Container(parent=root)
+    sibling.register(Service, Service, False)
+    root.compile()
+    profiler = child.profile()
+
+    sibling.get(Service)
+    root.get(Repository)
+
+    assert root.profiler is None
+    assert profiler.stats == {}
+
+    child.get(Service)
+    assert set(profiler.stats) == {Service, Repository, Pool}
+
+    child.profiler = None
+    child.get(Service)
+    assert profiler.stats[Service].resolutions == 1
@@ -0,0 +1,20 @@
+from typing import Any, Generic, TypeVar
+
+T = TypeVar('T')
+
+
+class Provider(Generic[T]):
+    """Annotation of an argument receiving a factory of ``T``.
+
+    A constructor argument annotated with ``Provider[Service]`` gets a
+    function without arguments returning ``Service`` as `get` would.
+    The function is bound to the compiled resolver of ``Service`` when
+    the dependent is built, so calls skip key lookup and the parent
+    chain.
+    """
+
+    __slots__ = ()
+
+
+def is_provider(annotation: Any) -> bool:
+    return getattr(annotation, '__origin__', None) is Provider
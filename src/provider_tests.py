@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+
+from . import exceptions
+from .container import Container
+from .plan import Argument, make_plan
+from .provider import Provider
+
+
+class Worker:
+    pass
+
+
+class Config:
+    pass
+
+
+class Processor:
+    def __init__(self, workers: Provider[Worker], config: Provider[Config]):
+        self.workers = workers
+        self.config = config
+
+
+class Session:
+    pass
+
+
+class Repository:
+    def __init__(self, sessions: Provider[Session]):
+        self.sessions = sessions
+
+
+@pytest.fixture()
+def f_container():
+    root = Container()
+    root.register(Config, Config, True)
+    container = Container(parent=root)
+    container.register(Worker, Worker, False)
+    container.register(Processor, Processor, False)
+    return container
+
+
+def test_should_plan_provider_arguments():
+    assert make_plan(Processor) == (
+        Argument('workers', Provider[Worker], (Worker,), provider=True),
+        Argument('config', Provider[Config], (Config,), provider=True),
+    )
+
+
+@pytest.mark.parametrize('compiled', [False, True])
+def test_should_inject_factories(f_container, compiled):
+    if compiled:
+        f_container.compile()
+
+    processor = f_container.get(Processor)
+
+    first, second = processor.workers(), processor.workers()
+    assert isinstance(first, Worker)
+    assert first is not second
+    assert processor.config() is f_container.get(Config)
+
+
+def test_should_inject_factories_of_context_values():
+    config = Config()
+    container = Container({Worker: lambda injector: Worker(), Config: config})
+    container.register(Processor, Processor, False)
+
+    processor = container.get(Processor)
+
+    assert isinstance(processor.workers(), Worker)
+    assert processor.config() is config
+
+
+def test_should_raise_for_missing_provided_dependency():
+    container = Container()
+    container.register(Processor, Processor, False)
+
+    with pytest.raises(exceptions.NonInjectableArgument):
+        container.get(Processor)
+
+
+def test_should_provide_scoped_instances_of_scope():
+    container = Container()
+    container.register(Session, Session, False, scoped=True)
+    container.register(Repository, Repository, False)
+
+    with container.scope() as scope:
+        repository = scope.get(Repository)
+        assert repository.sessions() is scope.get(Session)
+
+    with pytest.raises(exceptions.ScopeError):
+        container.get(Repository).sessions()
+
+
+def test_should_aget_factories(f_container):
+    processor = asyncio.run(f_container.aget(Processor))
+
+    assert isinstance(processor.workers(), Worker)
+
+
+@pytest.mark.parametrize('compiled', [False, True])
+def test_should_provide_singletons_built_again_after_close(
+    f_container, compiled,
+):
+    if compiled:
+        f_container.compile()
+    processor = f_container.get(Processor)
+    config = processor.config()
+
+    f_container._parent.close()
+
+    assert processor.config() is not config
+    assert processor.config() is f_container.get(Config)
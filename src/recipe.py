@@ -0,0 +1,131 @@
+"""Recipes for rebuilding a container in another process.
+
+A recipe holds registrations of a container chain by import path, their
+lifetimes, fork policies and constructor plans, and the picklable part
+of the context. It is cheap to pickle and can be sent to process pool
+workers, which build an equivalent container once per process.
+"""
+import pickle
+import threading
+import uuid
+from typing import Any, Dict, Hashable, List, NamedTuple, Tuple
+
+from . import snapshot
+
+TKey = Tuple[str, Any]  # ('class', import path) or ('value', key)
+
+
+class Registration(NamedTuple):
+    key: TKey
+    klass: str
+    lifetime: str
+    fork_policy: str
+    plan: Any
+
+
+class Level(NamedTuple):
+    registrations: Tuple[Registration, ...]
+    context: Tuple[Tuple[TKey, Any], ...]
+
+
+class Recipe(NamedTuple):
+    id: str
+    levels: Tuple[Level, ...]  # root container first
+    skipped: Tuple[str, ...]  # what could not be exported
+
+
+_built: Dict[str, Any] = {}
+_built_lock = threading.Lock()
+
+
+_UNPICKLABLE = (
+    snapshot.UnsupportedValue, pickle.PicklingError, AttributeError, TypeError
+)
+
+
+def encode_key(key: Hashable) -> TKey:
+    if isinstance(key, type):
+        return 'class', snapshot.import_path(key)
+    pickle.dumps(key)
+    return 'value', key
+
+
+def decode_key(key: TKey) -> Hashable:
+    kind, value = key
+    if kind == 'class':
+        return snapshot.import_class(value)
+    return value
+
+
+def export(container) -> Recipe:
+    levels: List[Level] = []
+    skipped: List[str] = []
+
+    while container is not None:
+        registrations = []
+        for key in list(container._registrations):
+            klass = container.get_injectable(key)
+            try:
+                encoded_key = encode_key(key)
+                class_path = snapshot.import_path(klass)
+            except _UNPICKLABLE:
+                skipped.append(f'registration {key!r}')
+                continue
+
+            try:
+                plan = snapshot.encode_plan(container._get_plan(klass))
+            except (snapshot.UnsupportedValue, ValueError, TypeError):
+                plan = None
+
+            registrations.append(Registration(
+                encoded_key,
+                class_path,
+                snapshot.lifetime(container, key),
+                container.get_fork_policy(key).value,
+                plan,
+            ))
+
+        context = []
+        for key, value in container._context.items():
+            try:
+                encoded_key = encode_key(key)
+                pickle.dumps(value)
+            except _UNPICKLABLE:
+                skipped.append(f'context {key!r}')
+                continue
+            context.append((encoded_key, value))
+
+        levels.append(Level(tuple(registrations), tuple(context)))
+        container = container._parent
+
+    return Recipe(uuid.uuid4().hex, tuple(reversed(levels)), tuple(skipped))
+
+
+def build(recipe: Recipe, container_class: type):
+    """Container chain described by `recipe`, built once per process."""
+    with _built_lock:
+        container = _built.get(recipe.id)
+        if container is not None:
+            return container
+
+        for level in recipe.levels:
+            container = container_class(
+                {decode_key(key): value for key, value in level.context},
+                parent=container,
+            )
+            for registration in level.registrations:
+                klass = snapshot.import_class(registration.klass)
+                container.register(
+                    decode_key(registration.key),
+                    klass,
+                    singleton=registration.lifetime == snapshot.SINGLETON,
+                    scoped=registration.lifetime == snapshot.SCOPED,
+                    fork_policy=registration.fork_policy,
+                )
+                if registration.plan is not None:
+                    container._set_plan(
+                        klass, snapshot.decode_plan(registration.plan)
+                    )
+
+        _built[recipe.id] = container
+        return container
@@ -0,0 +1,80 @@
+import pickle
+import threading
+
+from concurrent.futures import ProcessPoolExecutor
+
+from . import recipe
+from .container import Container
+
+
+class Settings:
+    pass
+
+
+class Pool:
+    def __init__(self, settings: Settings, size: int):
+        self.settings = settings
+        self.size = size
+
+
+class Service:
+    def __init__(self, pool: Pool):
+        self.pool = pool
+
+
+def make_container():
+    parent = Container({int: 4})
+    parent.register(Settings, Settings, True)
+    container = Container({'lock': threading.Lock(), 'factory': lambda: 1},
+                          parent=parent)
+    container.register(Pool, Pool, True, fork_policy='rebuild_in_child')
+    container.register('service', Service, False)
+    return container
+
+
+def pool_size(container_recipe):
+    container = Container.from_recipe(container_recipe)
+    return id(container), container.get('service').pool.size
+
+
+def test_recipe_is_picklable_and_skips_unpicklable_context():
+    container_recipe = make_container().export_recipe()
+
+    assert pickle.loads(pickle.dumps(container_recipe)) == container_recipe
+    assert container_recipe.skipped == ("context 'lock'", "context 'factory'")
+
+
+def test_from_recipe_rebuilds_chain():
+    container_recipe = pickle.loads(
+        pickle.dumps(make_container().export_recipe())
+    )
+    container = Container.from_recipe(container_recipe)
+
+    service = container.get('service')
+    assert service.pool.size == 4
+    assert service.pool is container.get(Pool)
+    assert service.pool.settings is container._parent.get(Settings)
+    assert not container.is_singleton('service')
+    assert container.get_fork_policy(Pool).value == 'rebuild_in_child'
+    assert Service in container._plans
+
+
+def test_from_recipe_is_cached_per_recipe():
+    container_recipe = make_container().export_recipe()
+
+    container = Container.from_recipe(container_recipe)
+    assert Container.from_recipe(container_recipe) is container
+    assert Container.from_recipe(
+        make_container().export_recipe()
+    ) is not container
+
+
+def test_from_recipe_in_process_pool():
+    container_recipe = make_container().export_recipe()
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        results = list(executor.map(pool_size, [container_recipe] * 3))
+
+    assert {size for _, size in results} == {4}
+    assert len({container_id for container_id, _ in results}) == 1
+    assert container_recipe.id not in recipe._built
@@ -0,0 +1,183 @@
+"""Registration of classes found in source code without importing it.
+
+Modules of a package are parsed and classes decorated with a container,
+e.g. ``@injectable()`` or ``@injectable('repository', singleton=False)``,
+are indexed with the literal arguments of the decorator. Containers
+register placeholders for them, which import the defining module when
+the key is first resolved. The index can be stored in a JSON manifest to
+skip parsing on startup.
+"""
+import ast
+import importlib.util
+import json
+import os
+from typing import Any, Hashable, Iterator, List, NamedTuple, Sequence
+
+from . import exceptions, snapshot
+from .injector import ForkPolicy
+
+VERSION = 1
+
+_DECORATOR_ARGUMENTS = ('key', 'singleton', 'scoped', 'fork_policy')
+
+
+class Entry(NamedTuple):
+    """Decorated class, registered under `key` or its import path."""
+    path: str  # module:qualname
+    key: Hashable
+    singleton: bool
+    scoped: bool
+    fork_policy: ForkPolicy
+
+    @property
+    def registration_key(self) -> Hashable:
+        return self.path if self.key is None else self.key
+
+
+class Placeholder:
+    """Registered in place of a class which isn't imported yet."""
+
+    __slots__ = ('path',)
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __repr__(self) -> str:
+        return f'<Placeholder {self.path}>'
+
+    def load(self) -> type:
+        try:
+            return snapshot.import_class(self.path)
+        except (ImportError, AttributeError) as error:
+            raise exceptions.NonInjectableClass(
+                f'can not import {self.path}: {error}', self.path
+            ) from error
+
+
+def _module_files(package: str) -> Iterator[Sequence[str]]:
+    """Module names and source files of `package` and its subpackages."""
+    spec = importlib.util.find_spec(package)
+    if spec is None:
+        raise ModuleNotFoundError(f'No module named {package!r}')
+    if not spec.submodule_search_locations:
+        if spec.origin and spec.origin.endswith('.py'):
+            yield package, spec.origin
+        return
+
+    for location in spec.submodule_search_locations:
+        for directory, directories, files in os.walk(location):
+            directories[:] = sorted(
+                name for name in directories
+                if os.path.exists(os.path.join(directory, name, '__init__.py'))
+            )
+            parts = os.path.relpath(directory, location).split(os.sep)
+            prefix = '.'.join([package] + [p for p in parts if p != '.'])
+            for name in sorted(files):
+                if not name.endswith('.py'):
+                    continue
+                module = name[:-3]
+                yield (
+                    prefix if module == '__init__' else f'{prefix}.{module}',
+                    os.path.join(directory, name),
+                )
+
+
+def _decorator_name(node: ast.expr) -> str:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return ''
+
+
+def _literal(node: ast.expr) -> Any:
+    if (
+        isinstance(node, ast.Attribute)
+        and _decorator_name(node.value) == ForkPolicy.__name__
+    ):
+        return ForkPolicy[node.attr]
+    return ast.literal_eval(node)
+
+
+def _entry(path: str, decorator: ast.Call) -> Entry:
+    arguments = {'key': None, 'singleton': True, 'scoped': False,
+                 'fork_policy': ForkPolicy.SHARE}
+    for name, node in zip(_DECORATOR_ARGUMENTS, decorator.args):
+        arguments[name] = _literal(node)
+    for keyword in decorator.keywords:
+        if keyword.arg in arguments:
+            arguments[keyword.arg] = _literal(keyword.value)
+    arguments['fork_policy'] = ForkPolicy(arguments['fork_policy'])
+    hash(arguments['key'])
+    return Entry(path, **arguments)
+
+
+def _module_entries(
+    module: str,
+    body: List[ast.stmt],
+    decorators: Sequence[str],
+    prefix: str = '',
+) -> Iterator[Entry]:
+    for node in body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        qualname = prefix + node.name
+        for decorator in node.decorator_list:
+            if (
+                isinstance(decorator, ast.Call)
+                and _decorator_name(decorator.func) in decorators
+            ):
+                try:
+                    yield _entry(f'{module}:{qualname}', decorator)
+                except (ValueError, KeyError, TypeError, SyntaxError):
+                    pass  # arguments known only at runtime
+                break
+        yield from _module_entries(
+            module, node.body, decorators, qualname + '.'
+        )
+
+
+def index(
+    package: str,
+    decorators: Sequence[str] = ('injectable',),
+) -> List[Entry]:
+    """Classes of `package` decorated with a call of one of `decorators`
+    with literal arguments."""
+    entries = []
+    for module, path in _module_files(package):
+        with open(path, 'rb') as source:
+            tree = ast.parse(source.read(), path)
+        entries.extend(_module_entries(module, tree.body, decorators))
+    return entries
+
+
+def dump(entries: Sequence[Entry], path: str):
+    with open(path, 'w') as manifest:
+        json.dump({'version': VERSION, 'entries': [
+            {
+                'class': entry.path,
+                'key': snapshot.encode(entry.key),
+                'singleton': entry.singleton,
+                'scoped': entry.scoped,
+                'fork_policy': entry.fork_policy.value,
+            }
+            for entry in entries
+        ]}, manifest, separators=(',', ':'))
+
+
+def load(path: str) -> List[Entry]:
+    with open(path) as manifest:
+        data = json.load(manifest)
+    if data.get('version') != VERSION:
+        raise ValueError(f'unsupported manifest version in {path}')
+
+    return [
+        Entry(
+            entry['class'],
+            snapshot.decode(entry['key']),
+            entry['singleton'],
+            entry['scoped'],
+            ForkPolicy(entry['fork_policy']),
+        )
+        for entry in data['entries']
+    ]
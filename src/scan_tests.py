@@ -0,0 +1,198 @@
+import itertools
+import sys
+import textwrap
+import pytest
+
+from unittest.mock import patch
+
+from . import exceptions, scan
+from .container import Container
+from .injector import ForkPolicy
+
+_packages = itertools.count()
+
+SERVICES = '''
+from src.injector import ForkPolicy
+from . import injectable
+
+
+@injectable()
+class Session:
+    pass
+
+
+@injectable('repository', singleton=False)
+class Repository:
+    def __init__(self, session: Session):
+        self.session = session
+
+
+class Outer:
+    @injectable(key=('outer', 'inner'), fork_policy=ForkPolicy.FORBID)
+    class Inner:
+        pass
+
+
+@injectable(key=Session)
+class Dynamic:
+    pass
+
+
+def factory():
+    @injectable()
+    class Local:
+        pass
+'''
+
+
+@pytest.fixture()
+def f_package(tmp_path, monkeypatch):
+    name = f'scanned_app_{next(_packages)}'
+    package = tmp_path / name
+    (package / 'api').mkdir(parents=True)
+    (package / '__init__.py').write_text(
+        'from src.container import Container\n'
+        'injectable = Container()\n'
+    )
+    (package / 'services.py').write_text(SERVICES)
+    (package / 'api' / '__init__.py').write_text('')
+    (package / 'api' / 'handlers.py').write_text(textwrap.dedent('''
+        from .. import injectable
+        from ..services import Repository
+
+
+        @injectable('handler', singleton=False, scoped=True)
+        class Handler:
+            def __init__(self, repository: 'repository'):
+                self.repository = repository
+    '''))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield name
+    for module in list(sys.modules):
+        if module.startswith(name):
+            del sys.modules[module]
+
+
+def test_should_index_decorated_classes(f_package):
+    entries = scan.index(f_package)
+
+    assert entries == [
+        scan.Entry(
+            f'{f_package}.services:Session', None, True, False,
+            ForkPolicy.SHARE,
+        ),
+        scan.Entry(
+            f'{f_package}.services:Repository', 'repository', False, False,
+            ForkPolicy.SHARE,
+        ),
+        scan.Entry(
+            f'{f_package}.services:Outer.Inner', ('outer', 'inner'), True,
+            False, ForkPolicy.FORBID,
+        ),
+        scan.Entry(
+            f'{f_package}.api.handlers:Handler', 'handler', False, True,
+            ForkPolicy.SHARE,
+        ),
+    ]
+    assert f'{f_package}.services' not in sys.modules
+
+
+def test_should_import_modules_on_first_resolution(f_package):
+    container = Container()
+
+    keys = container.scan(f_package)
+
+    assert 'repository' in keys
+    assert f'{f_package}.services' not in sys.modules
+
+    repository = container.get('repository')
+
+    assert f'{f_package}.services' in sys.modules
+    assert f'{f_package}.api.handlers' not in sys.modules
+    assert repository is not container.get('repository')
+    assert repository.session is container.get(
+        f'{f_package}.services:Session'
+    )
+    assert container.get_fork_policy(('outer', 'inner')) is (
+        ForkPolicy.FORBID
+    )
+
+
+def test_decorators_of_scanned_container_should_replace_placeholders(
+    f_package,
+):
+    container = __import__(f_package).injectable
+    container.scan(f_package)
+
+    with container.scope() as scope:
+        handler = scope.get('handler')
+
+    assert handler.repository.session is container.get(
+        sys.modules[f'{f_package}.services'].Session
+    )
+
+
+def test_should_resolve_scanned_classes_imported_by_other_code(f_package):
+    container = Container()
+    container.scan(f_package)
+    services = __import__(f'{f_package}.services').services
+
+    class Consumer:
+        def __init__(self, session: services.Session):
+            self.session = session
+
+    child = Container(parent=container)
+    child.register(Consumer, Consumer, False)
+
+    session = container.get(services.Session)
+
+    assert isinstance(session, services.Session)
+    assert child.get(Consumer).session is session
+    assert container.get(f'{f_package}.services:Session') is session
+    assert not container._placeholders.get(f'{f_package}.services:Session')
+
+
+def test_should_resolve_dependencies_of_scanned_classes_by_class(f_package):
+    container = Container()
+    container.scan(f_package)
+    services = __import__(f'{f_package}.services').services
+
+    class Consumer:
+        def __init__(self, session: services.Session):
+            self.session = session
+
+    container.register(Consumer, Consumer, False)
+
+    assert isinstance(container.get(Consumer).session, services.Session)
+
+
+def test_should_load_placeholders_for_whole_graph_operations(f_package):
+    container = Container()
+    container.scan(f_package)
+
+    assert container.validate().ok
+    assert f'{f_package}.api.handlers' in sys.modules
+
+
+def test_should_use_manifest(f_package, tmp_path):
+    manifest = str(tmp_path / 'manifest.json')
+    assert Container().scan(f_package, manifest=manifest)
+
+    container = Container()
+    with patch.object(scan, 'index') as index_mock:
+        keys = container.scan(f_package, manifest=manifest)
+
+    index_mock.assert_not_called()
+    assert ('outer', 'inner') in keys
+    assert container.get('repository')
+
+
+def test_should_raise_for_missing_class():
+    container = Container()
+    container.register('missing', object, True)
+    container._registrations['missing'] = container._registrations[
+        'missing'
+    ]._replace(klass=scan.Placeholder('src.scan:Missing'))
+
+    with pytest.raises(exceptions.NonInjectableClass):
+        container.get('missing')
@@ -0,0 +1,65 @@
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from . import disposal
+
+_MISSING = object()
+
+
+class Scope:
+    """Lifetime of scoped services, e.g. a single request.
+
+    Resolution goes through resolvers compiled and cached by the
+    container, a scope itself only holds scoped instances and allocates
+    storage for them on first use. Leaving the scope closes them.
+    Scopes are not thread safe, use one scope per request or task.
+    """
+
+    __slots__ = ('_container', '_instances')
+
+    def __init__(self, container):
+        self._container = container
+        self._instances: Optional[Dict[Hashable, Any]] = None
+
+    def __enter__(self) -> 'Scope':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def __aenter__(self) -> 'Scope':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def close(self):
+        """Close scoped instances in reverse construction order."""
+        instances, self._instances = self._instances, None
+        if instances:
+            disposal.close_all(list(instances.values()))
+
+    async def aclose(self):
+        """Close scoped instances awaiting their async close hooks."""
+        instances, self._instances = self._instances, None
+        if instances:
+            await disposal.aclose_all(list(instances.values()))
+
+    def get(self, key: Hashable):
+        resolver, takes_scope = self._container._get_scope_resolver(key)
+        return resolver(self) if takes_scope else resolver()
+
+    def _get_scoped(
+        self,
+        key: Hashable,
+        build: Callable[['Scope'], Any],
+    ):
+        instances = self._instances
+        if instances is None:
+            instances = self._instances = {}
+        else:
+            instance = instances.get(key, _MISSING)
+            if instance is not _MISSING:
+                return instance
+
+        instance = instances[key] = build(self)
+        return instance
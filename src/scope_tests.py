@@ -0,0 +1,174 @@
+import asyncio
+import pytest
+
+from . import exceptions
+from .container import Container
+
+
+class Pool:
+    pass
+
+
+class Session:
+    def __init__(self, pool: Pool):
+        self.pool = pool
+
+
+class Repository:
+    def __init__(self, session: Session, pool: Pool):
+        self.session = session
+        self.pool = pool
+
+
+class Handler:
+    def __init__(self, repository: Repository, session: Session):
+        self.repository = repository
+        self.session = session
+
+
+@pytest.fixture()
+def f_container():
+    container = Container()
+    container.register(Pool, Pool, True)
+    container.register(Session, Session, False, scoped=True)
+    container.register(Repository, Repository, False)
+    container.register(Handler, Handler, False)
+    return container
+
+
+def test_should_share_scoped_instance_within_scope(f_container):
+    with f_container.scope() as scope:
+        handler = scope.get(Handler)
+
+        assert handler.session is handler.repository.session
+        assert handler.session is scope.get(Session)
+        assert handler is not scope.get(Handler)
+        assert handler.session.pool is f_container.get(Pool)
+
+
+def test_should_create_scoped_instance_per_scope(f_container):
+    with f_container.scope() as scope_1, f_container.scope() as scope_2:
+        session_1 = scope_1.get(Session)
+        session_2 = scope_2.get(Session)
+
+    assert session_1 is not session_2
+    assert session_1.pool is session_2.pool
+
+
+def test_should_resolve_scoped_service_registered_in_parent(f_container):
+    child = Container(parent=f_container)
+
+    class Service:
+        def __init__(self, session: Session):
+            self.session = session
+
+    child.register(Service, Service, False)
+
+    with child.scope() as scope:
+        assert scope.get(Service).session is scope.get(Session)
+
+
+def test_should_not_allocate_storage_without_scoped_instances(f_container):
+    with f_container.scope() as scope:
+        scope.get(Pool)
+        assert scope._instances is None
+
+        scope.get(Session)
+        assert scope._instances is not None
+
+    assert scope._instances is None
+
+
+def test_should_use_context_factory_for_scoped_service(f_container):
+    f_container.context[Session] = lambda injector: Session(Pool())
+
+    with f_container.scope() as scope:
+        session = scope.get(Session)
+
+        assert session is scope.get(Session)
+        assert session.pool is not f_container.get(Pool)
+
+
+@pytest.mark.parametrize('compiled', [False, True])
+def test_should_raise_for_scoped_service_outside_scope(f_container, compiled):
+    if compiled:
+        f_container.compile()
+
+    with pytest.raises(exceptions.ScopeError) as handler:
+        f_container.get(Handler)
+
+    assert handler.value.klass is Session
+
+    with pytest.raises(exceptions.ScopeError):
+        asyncio.run(f_container.aget(Session))
+
+
+def test_should_raise_for_singleton_depending_on_scoped_service(f_container):
+    class Cache:
+        def __init__(self, session: Session):
+            self.session = session
+
+    f_container.register(Cache, Cache, True)
+
+    with f_container.scope() as scope:
+        with pytest.raises(exceptions.ScopeError):
+            scope.get(Cache)
+
+
+def test_should_rebuild_scope_resolvers_on_register(f_container):
+    class OtherSession(Session):
+        pass
+
+    with f_container.scope() as scope:
+        assert type(scope.get(Handler).session) is Session
+
+    f_container.register(Session, OtherSession, False, scoped=True)
+
+    with f_container.scope() as scope:
+        assert type(scope.get(Handler).session) is OtherSession
+
+
+class ClosingSession(Session):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_should_close_scoped_instances_on_exit(f_container):
+    f_container.register(Session, ClosingSession, False, scoped=True)
+
+    with f_container.scope() as scope:
+        session = scope.get(Session)
+        pool = scope.get(Pool)
+
+    assert session.closed is True
+    assert scope._instances is None
+    assert f_container.get(Pool) is pool
+
+
+def test_should_aclose_scoped_instances_on_exit(f_container):
+    f_container.register(Session, ClosingSession, False, scoped=True)
+
+    async def main():
+        async with f_container.scope() as scope:
+            return scope.get(Handler).session
+
+    session = asyncio.run(main())
+
+    assert session.closed is True
+
+
+def test_should_resolve_scopes_of_frozen_container(f_container):
+    f_container.freeze()
+
+    with f_container.scope() as scope:
+        handler = scope.get(Handler)
+
+        assert handler.session is scope.get(Session)
+        assert handler.session.pool is f_container.get(Pool)
+
+    assert Handler in f_container._frozen_scope_resolvers
@@ -0,0 +1,209 @@
+"""Snapshots of resolved registration metadata.
+
+A snapshot is a JSON document listing per registration its key, the
+import path of the class, its lifetime and the constructor plan, so a
+new process can restore registrations and plans without inspecting
+signatures. Each entry carries a fingerprint of the source files of the
+class; entries whose source changed are restored without their plan.
+"""
+import importlib
+import json
+import os
+import sys
+from typing import Any, Dict, Hashable, List, Type, Union
+
+from .lazy import Lazy
+from .plan import Argument, TPlan
+from .provider import Provider
+
+VERSION = 1
+
+SINGLETON = 'singleton'
+TRANSIENT = 'transient'
+SCOPED = 'scoped'
+
+_NONE_TYPE_PATH = 'builtins:NoneType'
+
+# classes renamed, moved or deleted since the dump
+_IMPORT_ERRORS = (ImportError, AttributeError)
+
+
+class UnsupportedValue(ValueError):
+    pass
+
+
+def import_path(klass: Type) -> str:
+    if klass is type(None):
+        return _NONE_TYPE_PATH
+    if not isinstance(klass, type) or '<locals>' in klass.__qualname__:
+        raise UnsupportedValue(f'{klass!r} is not importable')
+    return f'{klass.__module__}:{klass.__qualname__}'
+
+
+def import_class(path: str) -> Type:
+    if path == _NONE_TYPE_PATH:
+        return type(None)
+
+    module_name, qualname = path.split(':')
+    value = importlib.import_module(module_name)
+    for name in qualname.split('.'):
+        value = getattr(value, name)
+    return value
+
+
+def encode(value: Any) -> Any:
+    """JSON compatible form of a key or an annotation."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, tuple):
+        return {'tuple': [encode(item) for item in value]}
+    return {'class': import_path(value)}
+
+
+def decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        if 'tuple' in value:
+            return tuple(decode(item) for item in value['tuple'])
+        return import_class(value['class'])
+    return value
+
+
+def fingerprint(klass: Type) -> str:
+    """Size and modification time of files defining `klass` and its
+    constructor."""
+    modules = {klass.__module__}
+    modules.add(getattr(klass.__init__, '__module__', None))
+
+    parts = []
+    for name in sorted(filter(None, modules)):
+        path = getattr(sys.modules.get(name), '__file__', None)
+        if path:
+            stat = os.stat(path)
+            parts.append(f'{name}:{stat.st_mtime_ns}:{stat.st_size}')
+    return ';'.join(parts)
+
+
+def lifetime(container, key: Hashable) -> str:
+    if container.is_scoped(key):
+        return SCOPED
+    if container.is_singleton(key):
+        return SINGLETON
+    return TRANSIENT
+
+
+def encode_plan(plan: TPlan) -> List[Dict[str, Any]]:
+    arguments = []
+    for argument in plan:
+        encoded = {
+            'name': argument.name,
+            'types': [encode(klass) for klass in argument.types],
+        }
+        if argument.lazy:
+            encoded['lazy'] = True
+        if argument.provider:
+            encoded['provider'] = True
+        arguments.append(encoded)
+    return arguments
+
+
+def decode_plan(arguments: List[Dict[str, Any]]) -> TPlan:
+    plan = []
+    for argument in arguments:
+        types = tuple(decode(klass) for klass in argument['types'])
+        annotation = types[0] if len(types) == 1 else Union[types]
+        lazy = argument.get('lazy', False)
+        provider = argument.get('provider', False)
+        if lazy:
+            annotation = Lazy[annotation]
+        elif provider:
+            annotation = Provider[annotation]
+        plan.append(
+            Argument(argument['name'], annotation, types, lazy, provider)
+        )
+    return tuple(plan)
+
+
+def dump(container, path: str) -> List[Hashable]:
+    """Write registrations of `container` with their plans to `path`.
+
+    Returns keys which can't be stored: neither JSON scalars, tuples nor
+    importable classes. Plans with annotations other than importable
+    classes are left out and inspected on first use after loading.
+    """
+    entries = []
+    skipped = []
+    for key in list(container._registrations):
+        klass = container.get_injectable(key)
+        try:
+            entry = {
+                'key': encode(key),
+                'class': import_path(klass),
+                'lifetime': lifetime(container, key),
+                'fork_policy': container.get_fork_policy(key).value,
+                'fingerprint': fingerprint(klass),
+            }
+        except UnsupportedValue:
+            skipped.append(key)
+            continue
+
+        try:
+            entry['plan'] = encode_plan(container._get_plan(klass))
+        except (UnsupportedValue, ValueError, TypeError):
+            pass
+        entries.append(entry)
+
+    with open(path, 'w') as snapshot_file:
+        json.dump(
+            {'version': VERSION, 'entries': entries},
+            snapshot_file,
+            separators=(',', ':'),
+        )
+
+    return skipped
+
+
+def load(container, path: str) -> List[Hashable]:
+    """Register entries of the snapshot at `path` into `container` and
+    seed their constructor plans.
+
+    Returns keys of stale entries: entries whose source changed since
+    the dump or whose plan refers to classes which can't be imported
+    anymore are registered and their plans are left to be inspected on
+    first use; entries whose key or class can't be imported are not
+    registered, a key which is a missing class is reported by its import
+    path.
+    """
+    with open(path) as snapshot_file:
+        snapshot = json.load(snapshot_file)
+    if snapshot.get('version') != VERSION:
+        raise ValueError(f'unsupported snapshot version in {path}')
+
+    stale = []
+    for entry in snapshot['entries']:
+        try:
+            key = decode(entry['key'])
+        except _IMPORT_ERRORS:
+            stale.append(entry['class'])
+            continue
+        try:
+            klass = import_class(entry['class'])
+        except _IMPORT_ERRORS:
+            stale.append(key)
+            continue
+
+        container.register(
+            key, klass,
+            singleton=entry['lifetime'] == SINGLETON,
+            scoped=entry['lifetime'] == SCOPED,
+            fork_policy=entry.get('fork_policy', 'share'),
+        )
+
+        if fingerprint(klass) != entry['fingerprint']:
+            stale.append(key)
+        elif 'plan' in entry:
+            try:
+                container._set_plan(klass, decode_plan(entry['plan']))
+            except _IMPORT_ERRORS:
+                stale.append(key)
+
+    return stale
@@ -0,0 +1,174 @@
+import json
+import os
+import sys
+import pytest
+
+from typing import Optional, Union
+from unittest.mock import patch
+
+from . import container as container_module, snapshot
+from .container import Container
+from .lazy import Lazy
+from .plan import make_plan
+
+
+class Pool:
+    pass
+
+
+class Session:
+    def __init__(self, pool: Pool):
+        self.pool = pool
+
+
+class Repository:
+    def __init__(self, session: Session, cache: Optional[Pool]):
+        self.session = session
+
+
+class Untyped:
+    def __init__(self, value: Optional['Undefined']):  # noqa: F821
+        self.value = value
+
+
+@pytest.fixture()
+def f_snapshot(tmp_path):
+    container = Container()
+    container.register(Pool, Pool, True, fork_policy='rebuild_in_child')
+    container.register(('db', 'session'), Session, False, scoped=True)
+    container.register('repository', Repository, False)
+    container.register(Untyped, Untyped, True)
+
+    path = str(tmp_path / 'snapshot.json')
+    assert container.snapshot(path) == []
+    return path
+
+
+@pytest.mark.parametrize('value', [
+    'name',
+    1,
+    None,
+    ('namespace', 'name'),
+    Pool,
+    type(None),
+])
+def test_should_encode_and_decode_values(value):
+    encoded = snapshot.encode(value)
+
+    assert snapshot.decode(json.loads(json.dumps(encoded))) == value
+
+
+def test_should_not_encode_local_classes():
+    class Local:
+        pass
+
+    with pytest.raises(snapshot.UnsupportedValue):
+        snapshot.encode(Local)
+
+
+def test_should_restore_registrations_and_plans(f_snapshot):
+    container = Container()
+
+    with patch.object(container_module, 'make_plan') as make_plan_mock:
+        assert container.restore(f_snapshot) == []
+
+        with container.scope() as scope:
+            repository = scope.get('repository')
+
+        make_plan_mock.assert_not_called()
+
+    assert isinstance(repository.session, Session)
+    assert repository.session.pool is container.get(Pool)
+    assert container.is_scoped(('db', 'session'))
+    assert container.is_singleton(Pool)
+    assert container.get_fork_policy(Pool).value == 'rebuild_in_child'
+    assert container._plans[Repository] == make_plan(Repository)
+    assert Untyped not in container._plans
+
+
+def test_should_report_stale_entries(f_snapshot):
+    with open(f_snapshot) as snapshot_file:
+        data = json.load(snapshot_file)
+    for entry in data['entries']:
+        if entry['class'].endswith(':Session'):
+            entry['fingerprint'] = 'changed'
+    with open(f_snapshot, 'w') as snapshot_file:
+        json.dump(data, snapshot_file)
+
+    container = Container()
+
+    assert container.restore(f_snapshot) == [('db', 'session'), Session]
+    assert Session not in container._plans
+    assert Repository in container._plans
+
+
+def test_should_report_renamed_classes(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, 'dont_write_bytecode', True)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    service_path = tmp_path / 'renamed_service.py'
+    service_path.write_text('class Service:\n    pass\n')
+    (tmp_path / 'renamed_user.py').write_text(
+        'from __future__ import annotations\n'
+        'import renamed_service\n'
+        'class User:\n'
+        '    def __init__(self, service: renamed_service.Service):\n'
+        '        pass\n'
+    )
+    import renamed_service
+    import renamed_user
+    for module in (renamed_service, renamed_user):
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+
+    container = Container()
+    container.register(renamed_service.Service, renamed_service.Service, True)
+    container.register('service', renamed_service.Service, True)
+    container.register(renamed_user.User, renamed_user.User, False)
+    path = str(tmp_path / 'snapshot.json')
+    container.snapshot(path)
+
+    service_path.write_text('class Renamed:\n    pass\n')
+    del sys.modules['renamed_service']
+    restored = Container()
+
+    assert restored.restore(path) == [
+        'renamed_service:Service', 'service', renamed_user.User,
+    ]
+    assert restored.is_injectable(renamed_user.User)
+    assert not restored.is_injectable('service')
+    assert renamed_user.User not in restored._plans
+
+
+def test_should_skip_non_storable_keys(tmp_path):
+    class Local:
+        pass
+
+    key = tuple([object()])
+    container = Container()
+    container.register(key, Pool, True)
+    container.register(Local, Local, True)
+
+    path = str(tmp_path / 'snapshot.json')
+
+    assert container.snapshot(path) == [key, Local]
+    assert os.path.exists(path)
+
+
+def test_should_restore_union_annotation(tmp_path):
+    class_path = f'{__name__}:Session'
+    plan = snapshot.decode_plan([
+        {'name': 'value', 'types': [{'class': class_path}, None]},
+        {'name': 'other', 'types': [{'class': class_path}]},
+    ])
+
+    assert plan[0].annotation == Union[Session, None]
+    assert plan[1].annotation is Session
+
+
+def test_should_encode_and_decode_lazy_plan():
+    class Handler:
+        def __init__(self, session: Lazy[Session], pool: Pool):
+            pass
+
+    plan = make_plan(Handler)
+
+    assert snapshot.decode_plan(snapshot.encode_plan(plan)) == plan
@@ -0,0 +1,130 @@
+from typing import Any, Dict, Hashable, Iterator, List, Set, Tuple
+
+from . import exceptions
+from .plan import Source
+
+TNode = Tuple[Any, Hashable]  # container and class
+
+
+class ValidationReport:
+    """Problems found in a container graph without building it."""
+
+    def __init__(self):
+        self.missing: List[exceptions.NonInjectableArgument] = []
+        self.cycles: List[exceptions.CircularDependency] = []
+
+    @property
+    def errors(self) -> List[exceptions.InjectionError]:
+        return [*self.missing, *self.cycles]
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and not self.cycles
+
+    def raise_for_errors(self):
+        if not self.ok:
+            raise exceptions.InvalidContainer(
+                '\n'.join(str(error) for error in self.errors),
+                self.errors,
+            )
+
+
+def validate(container) -> ValidationReport:
+    """Check every class registered in `container` and its parents.
+
+    Arguments nothing in the chain provides are reported as
+    `NonInjectableArgument`, dependency cycles, found as strongly
+    connected components, as `CircularDependency`.
+    """
+    report = ValidationReport()
+    graph: Dict[TNode, Set[TNode]] = {}
+
+    for node in _registered_nodes(container):
+        owner, klass = node
+        dependencies = graph[node] = set()
+
+        target = owner.get_injectable(klass)
+        if target in owner._context:
+            continue
+
+        for argument in owner._get_plan(target):
+            source, provider, value = owner._get_source(argument)
+            if source is Source.INJECTABLE and not argument.deferred:
+                dependencies.add((provider, provider.get_injectable(value)))
+            elif source is Source.MISSING:
+                report.missing.append(exceptions.NonInjectableArgument(
+                    f'Non injectable argument {argument.name!r} '
+                    f'of {target}: {argument.annotation}',
+                    target,
+                    argument.name,
+                    argument.annotation,
+                ))
+
+    for component in _strongly_connected(graph):
+        cycle = [klass for _, klass in component]
+        report.cycles.append(exceptions.CircularDependency(
+            'Circular dependency ' + ' -> '.join(map(str, cycle)),
+            cycle,
+        ))
+
+    return report
+
+
+def _registered_nodes(container) -> Iterator[TNode]:
+    seen = set()
+    while container is not None:
+        for key in list(container._registrations):
+            node = container, container.get_injectable(key)
+            if node not in seen:
+                seen.add(node)
+                yield node
+        container = container._parent
+
+
+def _strongly_connected(
+    graph: Dict[TNode, Set[TNode]],
+) -> Iterator[List[TNode]]:
+    """Cyclic strongly connected components, iterative Tarjan."""
+    index: Dict[TNode, int] = {}
+    lowlink: Dict[TNode, int] = {}
+    stack: List[TNode] = []
+    on_stack: Set[TNode] = set()
+
+    for root in graph:
+        if root in index:
+            continue
+
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.get(root, ())))]
+
+        while work:
+            node, dependencies = work[-1]
+            for dependency in dependencies:
+                if dependency not in index:
+                    index[dependency] = lowlink[dependency] = len(index)
+                    stack.append(dependency)
+                    on_stack.add(dependency)
+                    work.append(
+                        (dependency, iter(graph.get(dependency, ())))
+                    )
+                    break
+                if dependency in on_stack:
+                    lowlink[node] = min(lowlink[node], index[dependency])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in graph.get(node, ()):
+                        yield component[::-1]
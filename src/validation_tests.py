@@ -0,0 +1,136 @@
+import pytest
+
+from typing import Optional, Union
+
+from . import exceptions
+from .container import Container
+
+
+class A:
+    pass
+
+
+class B:
+    def __init__(self, a: A):
+        self.a = a
+
+
+class C:
+    def __init__(self, b: Union[A, B], value: Optional[int]):
+        self.b = b
+
+
+def test_should_validate_correct_graph():
+    root = Container()
+    root.register(A, A, True)
+    child = Container(parent=root)
+    child.register(B, B, False)
+    child.register('c', C, True)
+
+    report = child.validate()
+
+    assert report.ok is True
+    assert report.errors == []
+    report.raise_for_errors()
+
+
+def test_should_report_every_missing_argument():
+    container = Container()
+
+    class D:
+        def __init__(self, a: A, value: int, name: str):
+            pass
+
+    container.register(B, B, True)
+    container.register(D, D, True)
+
+    report = container.validate()
+
+    assert report.ok is False
+    assert [
+        (error.client, error.argument_name, error.argument_type)
+        for error in report.missing
+    ] == [
+        (B, 'a', A),
+        (D, 'a', A),
+        (D, 'value', int),
+        (D, 'name', str),
+    ]
+
+
+def test_should_use_context_and_parents_when_validating():
+    root = Container({int: 1})
+    child = Container({A: lambda injector: A()}, parent=root)
+
+    class D:
+        def __init__(self, a: A, value: int):
+            pass
+
+    class E:
+        def __init__(self, value: str):
+            pass
+
+    child.register(D, D, True)
+    child.register(E, E, False)
+    child.context[E] = lambda injector: E('factory')
+
+    assert child.validate().ok is True
+
+
+def test_should_report_cycles():
+    container = Container()
+
+    class First:
+        def __init__(self, second: 'Second'):
+            pass
+
+    class Second:
+        def __init__(self, third: 'Third'):
+            pass
+
+    class Third:
+        def __init__(self, first: First, missing: int):
+            pass
+
+    class Itself:
+        def __init__(self, itself: 'Itself'):
+            pass
+
+    First.__init__.__annotations__['second'] = Second
+    Second.__init__.__annotations__['third'] = Third
+    Itself.__init__.__annotations__['itself'] = Itself
+
+    for klass in (First, Second, Third, Itself, A, B):
+        container.register(klass, klass, False)
+
+    report = container.validate()
+
+    assert sorted(
+        [sorted(klass.__name__ for klass in error.cycle)
+         for error in report.cycles]
+    ) == [['First', 'Second', 'Third'], ['Itself']]
+    assert [error.argument_name for error in report.missing] == ['missing']
+
+    with pytest.raises(exceptions.InvalidContainer) as handler:
+        report.raise_for_errors()
+
+    assert len(handler.value.errors) == 3
+
+
+def test_should_validate_deep_chain_without_recursion():
+    container = Container()
+    previous = A
+    container.register(A, A, False)
+
+    for index in range(5000):
+        namespace = {'Previous': previous}
+        exec(
+            'class Link:\n'
+            '    def __init__(self, previous: Previous):\n'
+            '        pass\n',
+            namespace,
+        )
+        previous = namespace['Link']
+        container.register(previous, previous, False)
+
+    assert container.validate().ok is True